@@ -0,0 +1,378 @@
+"""
+Proteas benchmarks - Throughput, latency and memory for the hot paths.
+
+Runs offline with the standard library only. Throughput (ops/sec) comes
+from timing batches of calls; latency percentiles come from timing
+individual calls, so p99 shows the per-call tail. Peak traced memory is
+measured for a single call.
+
+Usage:
+    python benchmarks/run.py                          # run everything
+    python benchmarks/run.py -k compile               # only matching scenarios
+    python benchmarks/run.py --save v0.0.5            # store a baseline
+    python benchmarks/run.py --compare v0.0.5         # fail on regressions
+    python benchmarks/run.py --quick --json out.json  # fewer samples, raw output
+
+To record a baseline for an older release, run a copy of this script
+from a checkout of that release (see the README).
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tracemalloc
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proteas  # noqa: E402
+from proteas import Proteas, PromptTemplateUnit, generate_combinations  # noqa: E402
+
+# Added after v0.0.5. Their scenarios are skipped on trees that lack them,
+# so a baseline can be recorded by running this script against a release.
+CombinationIndex = getattr(proteas, "CombinationIndex", None)
+SegmentEngine = getattr(proteas, "SegmentEngine", None)
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+SCENARIOS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def scenario(name: str, requires: tuple[object, ...] = ()):
+    """
+    Register a scenario. The decorated function sets up and returns the call to time.
+
+    Scenarios whose `requires` features are missing (None) are not registered.
+    """
+    def register(setup: Callable[[], Callable[[], object]]):
+        if all(feature is not None for feature in requires):
+            SCENARIOS[name] = setup
+        return setup
+    return register
+
+
+# --- Fixtures ---------------------------------------------------------------
+
+def make_units(count: int, placeholders: int = 2) -> list[PromptTemplateUnit]:
+    """Build units shaped like production: prefix, placeholders, some JSON braces."""
+    units = []
+    for i in range(count):
+        slots = " ".join(f"$var{j}" for j in range(placeholders))
+        units.append(PromptTemplateUnit(
+            name=f"unit_{i}",
+            content=f"Section {i}: follow these rules {{\"id\": {i}}} using {slots}.",
+            prefix=f"=== UNIT {i} ===" if i % 3 == 0 else None,
+            suffix="---" if i % 5 == 0 else None,
+            order=i if i % 2 == 0 else None,
+        ))
+    return units
+
+
+def make_values(placeholders: int = 2, size: int = 32) -> dict[str, str]:
+    """Placeholder values of the given size."""
+    return {f"var{j}": "x" * size for j in range(placeholders)}
+
+
+def make_proteas(count: int, engine=None) -> Proteas:
+    p = Proteas() if engine is None else Proteas(engine=engine)
+    return p.add_many(make_units(count))
+
+
+# --- Scenarios --------------------------------------------------------------
+
+@scenario("render_small")
+def _render_small():
+    unit = make_units(1, placeholders=3)[0]
+    values = make_values(3)
+    return lambda: unit.render(**values)
+
+
+@scenario("render_large_value")
+def _render_large_value():
+    unit = make_units(1, placeholders=1)[0]
+    values = make_values(1, size=200_000)
+    return lambda: unit.render(**values)
+
+
+@scenario("compile_10_units")
+def _compile_10():
+    p = make_proteas(10)
+    values = make_values()
+    return lambda: p.compile(**values)
+
+
+@scenario("compile_100_units")
+def _compile_100():
+    p = make_proteas(100)
+    values = make_values()
+    return lambda: p.compile(**values)
+
+
+@scenario("compile_1000_units")
+def _compile_1000():
+    p = make_proteas(1000)
+    values = make_values()
+    return lambda: p.compile(**values)
+
+
+@scenario("compile_100_units_large_values")
+def _compile_100_large():
+    p = make_proteas(100)
+    values = make_values(size=20_000)
+    return lambda: p.compile(**values)
+
+
+@scenario("compile_100_units_segment_engine", requires=(SegmentEngine,))
+def _compile_100_segment():
+    p = make_proteas(100, engine=SegmentEngine())
+    values = make_values()
+    return lambda: p.compile(**values)
+
+
+@scenario("compile_1000_units_segment_engine", requires=(SegmentEngine,))
+def _compile_1000_segment():
+    p = make_proteas(1000, engine=SegmentEngine())
+    values = make_values()
+    return lambda: p.compile(**values)
+
+
+@scenario("get_unit_1000_units")
+def _get_unit_1000():
+    p = make_proteas(1000)
+    return lambda: p.get_unit("unit_999")
+
+
+@scenario("combinations_20_units_iterate")
+def _combinations_iterate():
+    units = make_units(20)
+
+    def run():
+        for _ in generate_combinations(units, min_size=1, max_size=3):
+            pass
+    return run
+
+
+@scenario("combinations_20_units_compile")
+def _combinations_compile():
+    units = make_units(20)
+    values = make_values()
+
+    def run():
+        for _, p in generate_combinations(units, min_size=1, max_size=2):
+            p.compile(**values)
+    return run
+
+
+@scenario("combination_index_20_units_select", requires=(CombinationIndex,))
+def _combination_index_select():
+    units = make_units(20)
+    values = make_values()
+
+    def run():
+        index = CombinationIndex(units, min_size=1, max_size=3)
+        index.select(include=["unit_0"], exclude=["unit_1"], max_length=400, **values)
+    return run
+
+
+# --- Measurement ------------------------------------------------------------
+
+@dataclass
+class Result:
+    name: str
+    ops_per_sec: float
+    p50: float
+    p95: float
+    p99: float
+    peak_memory: int
+    samples: int
+    number: int
+    calls: int
+
+
+def _calibrate(call: Callable[[], object], target: float) -> int:
+    """Pick how many calls make one sample last roughly `target` seconds."""
+    number = 1
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = perf_counter() - start
+        if elapsed >= target or number >= 1_000_000:
+            return number
+        number *= 10 if elapsed < target / 10 else 2
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+MAX_TIMED_CALLS = 10_000
+
+
+def measure(name: str, samples: int, target: float) -> Result:
+    """
+    Time a scenario and trace the peak memory of one call.
+
+    ops/sec uses `samples` batches of `number` calls. Percentiles use up to
+    MAX_TIMED_CALLS individually timed calls (at least `samples`); each
+    includes perf_counter overhead, well under a microsecond.
+    """
+    call = SCENARIOS[name]()
+    call()  # warm up
+
+    number = _calibrate(call, target)
+    calls = max(samples, min(samples * number, MAX_TIMED_CALLS))
+    batches = []
+    latencies = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(samples):
+            start = perf_counter()
+            for _ in range(number):
+                call()
+            batches.append((perf_counter() - start) / number)
+        for _ in range(calls):
+            start = perf_counter()
+            call()
+            latencies.append(perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return Result(
+        name=name,
+        ops_per_sec=1.0 / statistics.mean(batches),
+        p50=_percentile(latencies, 50),
+        p95=_percentile(latencies, 95),
+        p99=_percentile(latencies, 99),
+        peak_memory=peak,
+        samples=samples,
+        number=number,
+        calls=calls,
+    )
+
+
+# --- Reporting --------------------------------------------------------------
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def _format_bytes(size: int) -> str:
+    for unit, scale in (("MiB", 1 << 20), ("KiB", 1 << 10)):
+        if size >= scale:
+            return f"{size / scale:.1f}{unit}"
+    return f"{size}B"
+
+
+def report(results: list[Result], baseline: dict[str, dict] | None) -> None:
+    header = f"{'scenario':<34}{'ops/sec':>12}{'p50':>10}{'p95':>10}{'p99':>10}{'peak mem':>11}"
+    if baseline is not None:
+        header += f"{'vs base':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        line = (f"{r.name:<34}{r.ops_per_sec:>12.1f}{_format_time(r.p50):>10}"
+                f"{_format_time(r.p95):>10}{_format_time(r.p99):>10}"
+                f"{_format_bytes(r.peak_memory):>11}")
+        if baseline is not None:
+            base = baseline.get(r.name)
+            change = f"{(r.ops_per_sec / base['ops_per_sec'] - 1) * 100:+.1f}%" if base else "new"
+            line += f"{change:>10}"
+        print(line)
+
+
+def regressions(results: list[Result], baseline: dict[str, dict], threshold: float) -> list[str]:
+    """Names of scenarios whose throughput dropped more than `threshold` (fraction)."""
+    slower = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base and r.ops_per_sec < base["ops_per_sec"] * (1 - threshold):
+            slower.append(r.name)
+    return slower
+
+
+def _baseline_path(name: str) -> str:
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load_baseline(name: str) -> dict[str, dict]:
+    with open(_baseline_path(name)) as f:
+        return json.load(f)["results"]
+
+
+def save_results(path: str, results: list[Result]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    payload = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {r.name: asdict(r) for r in results},
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run Proteas benchmarks.")
+    parser.add_argument("-k", dest="pattern", help="Only run scenarios containing this text")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+    parser.add_argument("--samples", type=int, default=30, help="Timed samples per scenario")
+    parser.add_argument("--target", type=float, default=0.02,
+                        help="Approximate seconds per sample (default: 0.02)")
+    parser.add_argument("--quick", action="store_true", help="Fewer, shorter samples")
+    parser.add_argument("--save", metavar="NAME", help="Store results as baseline NAME")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against baseline NAME")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed throughput drop vs baseline (default: 0.10)")
+    parser.add_argument("--json", metavar="PATH", help="Also write raw results to PATH")
+    args = parser.parse_args(argv)
+
+    names = [n for n in SCENARIOS if not args.pattern or args.pattern in n]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if args.quick:
+        args.samples, args.target = 5, 0.005
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    results = [measure(name, args.samples, args.target) for name in names]
+    report(results, baseline)
+
+    if args.save:
+        save_results(_baseline_path(args.save), results)
+    if args.json:
+        save_results(args.json, results)
+
+    if baseline is not None:
+        slower = regressions(results, baseline, args.threshold)
+        if slower:
+            print(f"\nRegressions beyond {args.threshold:.0%}: {', '.join(slower)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
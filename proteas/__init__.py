@@ -5,12 +5,65 @@ A domain-agnostic library for composing prompts from reusable units.
 """
 
 from proteas.unit import PromptTemplateUnit
+from proteas.conditions import Condition, Present, Absent, Equals, In
 from proteas.proteas import Proteas
-from proteas.combinations import generate_combinations, count_combinations
+from proteas.combinations import (
+    generate_combinations,
+    count_combinations,
+    sample_combinations,
+)
+from proteas.engine import Engine, RenderEngine, SegmentEngine
+from proteas.instrumentation import Instrumentation, RenderStats, UnitStats
+
+# Loaded on first access so `import proteas` does not pull in NumPy,
+# asyncio or socketserver (and `python -m proteas.service` runs cleanly).
+_LAZY = {
+    "CombinationIndex": "proteas.combination_index",
+    "CombinationPipeline": "proteas.pipeline",
+    "PipelineProgress": "proteas.pipeline",
+    "PipelineResult": "proteas.pipeline",
+    "CompileServer": "proteas.service",
+    "CompileClient": "proteas.service",
+    "ServiceError": "proteas.service",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
 __all__ = [
     "PromptTemplateUnit",
+    "Condition",
+    "Present",
+    "Absent",
+    "Equals",
+    "In",
     "Proteas",
     "generate_combinations",
     "count_combinations",
+    "sample_combinations",
+    "CombinationIndex",
+    "Engine",
+    "RenderEngine",
+    "SegmentEngine",
+    "Instrumentation",
+    "RenderStats",
+    "UnitStats",
+    "CombinationPipeline",
+    "PipelineProgress",
+    "PipelineResult",
+    "CompileServer",
+    "CompileClient",
+    "ServiceError",
 ]
@@ -0,0 +1,255 @@
+"""
+Combination index - The combination space as an array of integer bitmasks.
+
+Bit i of a mask is set when units[i] is part of the combination. Filtering
+by membership, size or predicted prompt length works on the whole array at
+once (vectorized with NumPy when it is installed, plain loops over an
+array("Q") otherwise). Proteas instances are only built for the masks you
+actually iterate over.
+"""
+
+from array import array
+from itertools import combinations
+from typing import Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is absent
+    np = None
+
+from proteas.unit import PromptTemplateUnit
+from proteas.proteas import Proteas
+from proteas.combinations import build_combination, resolve_sizes
+
+MAX_UNITS = 64
+
+
+def _rendered_length(unit: PromptTemplateUnit, kwargs: dict) -> int:
+    """Length of a unit's contribution to a compiled prompt."""
+    return len(unit.render(**kwargs)) if unit.applies(**kwargs) else 0
+
+
+class CombinationIndex:
+    """
+    Compact bitmask index over all combinations of a set of units.
+
+    Masks are stored in the same order generate_combinations yields them
+    (by size, then lexicographically), so iterating an unfiltered index
+    gives the same (names, Proteas) pairs.
+
+    Usage:
+        index = CombinationIndex(units, min_size=2, max_size=4, base_units=[header])
+        short = index.select(include=["tone"], exclude=["verbose"],
+                             max_length=2000, messages=sample)
+        for names, p in short:      # only selected masks are rendered
+            prompt = p.compile(messages=sample)
+    """
+
+    def __init__(
+        self,
+        units: list[PromptTemplateUnit],
+        min_size: int = 1,
+        max_size: int | None = None,
+        base_units: list[PromptTemplateUnit] | None = None,
+        separator: str = "\n\n",
+        use_numpy: bool | None = None,
+    ):
+        """
+        Materialize the combination space as bitmasks.
+
+        Args:
+            units: List of units to combine (at most 64)
+            min_size: Minimum number of units per combination (default: 1)
+            max_size: Maximum number of units per combination (default: len(units))
+            base_units: Optional units to include in ALL combinations
+            separator: Separator for Proteas instances
+            use_numpy: Force (True) or avoid (False) NumPy; None uses it if installed
+
+        Raises:
+            ValueError: If there are more than 64 units or sizes are invalid
+            ImportError: If use_numpy=True and NumPy is not installed
+        """
+        if len(units) > MAX_UNITS:
+            raise ValueError(f"CombinationIndex supports at most {MAX_UNITS} units")
+        if use_numpy and np is None:
+            raise ImportError("use_numpy=True requires numpy")
+
+        min_size, max_size = resolve_sizes(len(units), min_size, max_size)
+
+        self.units = list(units)
+        self.base_units = list(base_units or [])
+        self.separator = separator
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self._positions = {unit.name: i for i, unit in enumerate(self.units)}
+
+        bits = [1 << i for i in range(len(self.units))]
+        masks = (
+            sum(bits[i] for i in combo)
+            for size in range(min_size, max_size + 1)
+            for combo in combinations(range(len(self.units)), size)
+        )
+        if self.use_numpy:
+            self.masks = np.fromiter(masks, dtype=np.uint64)
+        else:
+            self.masks = array("Q", masks)
+
+    def _derive(self, masks) -> "CombinationIndex":
+        """Return an index over the same units with a subset of masks."""
+        derived = object.__new__(CombinationIndex)
+        derived.__dict__.update(self.__dict__)
+        derived.masks = masks
+        return derived
+
+    # --- Masks and names ----------------------------------------------------
+
+    def mask_of(self, names: Iterable[str]) -> int:
+        """
+        Build the mask for a set of unit names.
+
+        Raises:
+            KeyError: If a name is not one of the indexed units
+        """
+        mask = 0
+        for name in names:
+            mask |= 1 << self._positions[name]
+        return mask
+
+    def names(self, mask: int) -> tuple[str, ...]:
+        """Unit names in a mask, in unit-list order."""
+        mask = int(mask)
+        return tuple(unit.name for i, unit in enumerate(self.units) if mask >> i & 1)
+
+    def build(self, mask: int) -> tuple[tuple[str, ...], Proteas]:
+        """Build the (unit_names, proteas_instance) pair for one mask."""
+        mask = int(mask)
+        combo = [unit for i, unit in enumerate(self.units) if mask >> i & 1]
+        return build_combination(combo, self.base_units, self.separator)
+
+    # --- Vectorized columns -------------------------------------------------
+
+    def _columns(self) -> Iterator[tuple[int, object]]:
+        """Yield (unit position, 0/1 membership column) for every unit (NumPy only)."""
+        one = np.uint64(1)
+        for i in range(len(self.units)):
+            yield i, (self.masks >> np.uint64(i)) & one
+
+    def _weighted_sum(self, weights: list[int], base: int = 0):
+        """Sum of weights[i] over the set bits of every mask."""
+        if self.use_numpy:
+            total = np.full(len(self.masks), base, dtype=np.int64)
+            for i, column in self._columns():
+                if weights[i]:
+                    total += column.astype(np.int64) * weights[i]
+            return total
+        return array("q", (
+            base + sum(weights[i] for i in range(len(weights)) if mask >> i & 1)
+            for mask in self.masks
+        ))
+
+    def sizes(self):
+        """Number of (non-base) units in each combination."""
+        return self._weighted_sum([1] * len(self.units))
+
+    def predicted_lengths(self, **kwargs):
+        """
+        Length of each combination's compiled prompt, without compiling it.
+
+        Every unit is rendered once with kwargs; a combination's length is
+        the sum of its non-empty renders (base units included) plus the
+        separators between them, which matches Proteas.compile exactly.
+        Units whose `when` conditions fail count as empty.
+
+        Args:
+            **kwargs: Values to fill placeholders, as passed to compile
+        """
+        unit_lengths = [_rendered_length(unit, kwargs) for unit in self.units]
+        base_lengths = [_rendered_length(unit, kwargs) for unit in self.base_units]
+
+        text = self._weighted_sum(unit_lengths, sum(base_lengths))
+        rendered = self._weighted_sum(
+            [1 if length else 0 for length in unit_lengths],
+            sum(1 for length in base_lengths if length),
+        )
+        separator_length = len(self.separator)
+        if self.use_numpy:
+            return text + np.maximum(rendered - 1, 0) * separator_length
+        return array("q", (
+            t + max(r - 1, 0) * separator_length for t, r in zip(text, rendered)
+        ))
+
+    # --- Filtering ----------------------------------------------------------
+
+    def select(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        min_size: int | None = None,
+        max_size: int | None = None,
+        max_length: int | None = None,
+        **kwargs,
+    ) -> "CombinationIndex":
+        """
+        Filter combinations, returning a new index over the matching masks.
+
+        Args:
+            include: Unit names every combination must contain
+            exclude: Unit names no combination may contain
+            min_size: Minimum number of units per combination
+            max_size: Maximum number of units per combination
+            max_length: Maximum predicted prompt length (see predicted_lengths)
+            **kwargs: Placeholder values used to predict lengths
+
+        Returns:
+            A new CombinationIndex; the original is unchanged
+        """
+        required = self.mask_of(include)
+        forbidden = self.mask_of(exclude)
+        sizes = self.sizes() if min_size is not None or max_size is not None else None
+        lengths = self.predicted_lengths(**kwargs) if max_length is not None else None
+
+        if self.use_numpy:
+            keep = np.ones(len(self.masks), dtype=bool)
+            if required:
+                keep &= (self.masks & np.uint64(required)) == np.uint64(required)
+            if forbidden:
+                keep &= (self.masks & np.uint64(forbidden)) == 0
+            if min_size is not None:
+                keep &= sizes >= min_size
+            if max_size is not None:
+                keep &= sizes <= max_size
+            if lengths is not None:
+                keep &= lengths <= max_length
+            return self._derive(self.masks[keep])
+
+        selected = array("Q")
+        for j, mask in enumerate(self.masks):
+            if mask & required != required or mask & forbidden:
+                continue
+            if min_size is not None and sizes[j] < min_size:
+                continue
+            if max_size is not None and sizes[j] > max_size:
+                continue
+            if lengths is not None and lengths[j] > max_length:
+                continue
+            selected.append(mask)
+        return self._derive(selected)
+
+    # --- Lazy rendering -----------------------------------------------------
+
+    def __iter__(self) -> Iterator[tuple[tuple[str, ...], Proteas]]:
+        """Yield (unit_names, proteas_instance) for each mask, built on demand."""
+        for mask in self.masks:
+            yield self.build(mask)
+
+    def __getitem__(self, position: int) -> tuple[tuple[str, ...], Proteas]:
+        return self.build(self.masks[position])
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def __str__(self) -> str:
+        backend = "numpy" if self.use_numpy else "array"
+        return f"CombinationIndex({len(self.masks)} combinations of {len(self.units)} units, {backend})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -5,7 +5,9 @@ Useful when you need to generate prompts for all possible combinations
 of a set of units.
 """
 
+import random
 from itertools import combinations
+from math import comb, prod
 from typing import Iterator
 
 from proteas.unit import PromptTemplateUnit
@@ -39,36 +41,67 @@ def generate_combinations(
             print(names)  # ('a', 'b'), ('a', 'c'), ('b', 'c')
             prompt = p.compile()
     """
+    min_size, max_size = resolve_sizes(len(units), min_size, max_size)
+    base_units = base_units or []
+
+    # Generate combinations for each size
+    for size in range(min_size, max_size + 1):
+        for combo in combinations(units, size):
+            yield build_combination(combo, base_units, separator)
+
+
+def resolve_sizes(n: int, min_size: int, max_size: int | None) -> tuple[int, int]:
+    """
+    Validate and clamp combination sizes for n units.
+
+    Returns:
+        Tuple of (min_size, max_size), with max_size capped at n
+
+    Raises:
+        ValueError: If min_size < 1 or min_size > max_size
+    """
     if max_size is None:
-        max_size = len(units)
+        max_size = n
 
     # Validate
     if min_size < 1:
         raise ValueError("min_size must be at least 1")
-    if max_size > len(units):
-        max_size = len(units)
+    if max_size > n:
+        max_size = n
     if min_size > max_size:
         raise ValueError("min_size cannot be greater than max_size")
+    return min_size, max_size
 
-    base_units = base_units or []
 
-    # Generate combinations for each size
-    for size in range(min_size, max_size + 1):
-        for combo in combinations(units, size):
-            # Create Proteas instance
-            p = Proteas(separator=separator)
+def build_combination(
+    combo: tuple[PromptTemplateUnit, ...] | list[PromptTemplateUnit],
+    base_units: list[PromptTemplateUnit],
+    separator: str = "\n\n",
+) -> tuple[tuple[str, ...], Proteas]:
+    """
+    Build the (unit_names, proteas_instance) pair for one combination.
 
-            # Add base units first
-            for unit in base_units:
-                p.add(unit)
+    Args:
+        combo: The combination units, in unit-list order
+        base_units: Units included before the combination units
+        separator: Separator for the Proteas instance
 
-            # Add combination units
-            for unit in combo:
-                p.add(unit)
+    Returns:
+        Tuple of (unit_names, proteas_instance)
+    """
+    # Create Proteas instance
+    p = Proteas(separator=separator)
+
+    # Add base units first
+    for unit in base_units:
+        p.add(unit)
+
+    # Add combination units
+    for unit in combo:
+        p.add(unit)
 
-            # Yield names and instance
-            names = tuple(unit.name for unit in combo)
-            yield names, p
+    names = tuple(unit.name for unit in combo)
+    return names, p
 
 
 def count_combinations(
@@ -87,8 +120,6 @@ def count_combinations(
     Returns:
         Total number of combinations
     """
-    from math import comb
-
     if max_size is None:
         max_size = n
 
@@ -96,3 +127,237 @@ def count_combinations(
     for size in range(min_size, max_size + 1):
         total += comb(n, size)
     return total
+
+
+def sample_combinations(
+    units: list[PromptTemplateUnit],
+    k: int,
+    min_size: int = 1,
+    max_size: int | None = None,
+    base_units: list[PromptTemplateUnit] | None = None,
+    separator: str = "\n\n",
+    seed: int | None = None,
+    stratify: bool = False,
+    weights: dict[str, float] | None = None,
+) -> Iterator[tuple[tuple[str, ...], Proteas]]:
+    """
+    Generate Proteas instances for a random sample of unit combinations.
+
+    Combinations are drawn by rank and unranked directly, so the space is
+    never enumerated and sampling stays cheap for any number of units.
+    No combination is yielded twice.
+
+    Args:
+        units: List of units to combine
+        k: Number of combinations to draw
+        min_size: Minimum number of units per combination (default: 1)
+        max_size: Maximum number of units per combination (default: len(units))
+        base_units: Optional units to include in ALL combinations
+        separator: Separator for Proteas instances
+        seed: Seed for reproducible samples
+        stratify: Split k evenly across sizes instead of sampling uniformly
+                  over all combinations (which favors the most common sizes)
+        weights: Optional per-unit weights by name (default 1.0); heavier
+                 units are more likely to be picked, weight 0 excludes a unit
+
+    Yields:
+        Tuples of (unit_names, proteas_instance), like generate_combinations.
+
+    Raises:
+        ValueError: If k is negative or exceeds the number of combinations
+                    (of units with non-zero weight, when weights are given)
+
+    Example:
+        for names, p in sample_combinations(units, k=100, max_size=5, seed=1):
+            prompt = p.compile()
+    """
+    min_size, max_size = resolve_sizes(len(units), min_size, max_size)
+    if k < 0:
+        raise ValueError("k must not be negative")
+
+    # Units with weight 0 are left out of the space before counting it
+    unit_weights = [1.0] * len(units) if weights is None else [
+        weights.get(unit.name, 1.0) for unit in units
+    ]
+    candidates = [i for i, weight in enumerate(unit_weights) if weight > 0]
+    n = len(candidates)
+    total = count_combinations(n, min_size, max_size)
+    if k > total:
+        raise ValueError(f"k={k} exceeds the {total} available combinations")
+
+    base_units = base_units or []
+    rng = random.Random(seed)
+    sizes = range(min_size, max_size + 1)
+    quotas = _size_quotas(n, k, sizes) if stratify else None
+
+    if len({unit_weights[i] for i in candidates}) <= 1:
+        picks = _sample_uniform(rng, n, k, sizes, quotas)
+    else:
+        picks = _sample_weighted(rng, [unit_weights[i] for i in candidates], k, sizes, quotas)
+
+    for combo in picks:
+        yield build_combination([units[candidates[i]] for i in combo], base_units, separator)
+
+
+def unrank_combination(n: int, size: int, rank: int) -> tuple[int, ...]:
+    """
+    Return the rank-th size-combination of range(n) in itertools order.
+
+    Args:
+        n: Number of items
+        size: Items per combination
+        rank: Position in lexicographic order, 0 <= rank < comb(n, size)
+
+    Returns:
+        Tuple of item indices
+    """
+    combo = []
+    start = 0
+    for remaining in range(size, 0, -1):
+        for i in range(start, n):
+            block = comb(n - i - 1, remaining - 1)
+            if rank < block:
+                combo.append(i)
+                start = i + 1
+                break
+            rank -= block
+    return tuple(combo)
+
+
+def _floyd_sample(rng: random.Random, population: int, k: int) -> list[int]:
+    """Draw k distinct ints from range(population) in O(k) (Floyd's algorithm)."""
+    chosen: set[int] = set()
+    for j in range(population - k, population):
+        t = rng.randrange(j + 1)
+        chosen.add(j if t in chosen else t)
+    return list(chosen)
+
+
+def _size_quotas(n: int, k: int, sizes: range) -> dict[int, int]:
+    """Split k evenly across sizes, handing overflow from small sizes to the rest."""
+    quotas = dict.fromkeys(sizes, 0)
+    open_sizes = [size for size in sizes if comb(n, size)]
+    left = k
+    while left and open_sizes:
+        share, extra = divmod(left, len(open_sizes))
+        for position, size in enumerate(open_sizes):
+            want = share + (1 if position < extra else 0)
+            take = min(want, comb(n, size) - quotas[size])
+            quotas[size] += take
+            left -= take
+        open_sizes = [size for size in open_sizes if quotas[size] < comb(n, size)]
+    return quotas
+
+
+def _sample_uniform(
+    rng: random.Random,
+    n: int,
+    k: int,
+    sizes: range,
+    quotas: dict[int, int] | None,
+) -> Iterator[tuple[int, ...]]:
+    """Draw distinct ranks and unrank them lazily."""
+    for size, rank in _uniform_draws(rng, n, k, sizes, quotas):
+        yield unrank_combination(n, size, rank)
+
+
+def _uniform_draws(
+    rng: random.Random,
+    n: int,
+    k: int,
+    sizes: range,
+    quotas: dict[int, int] | None,
+) -> list[tuple[int, int]]:
+    """Draw k distinct (size, rank) pairs in random order."""
+    if quotas is None:
+        ranks = _floyd_sample(rng, count_combinations(n, sizes.start, sizes.stop - 1), k)
+        draws = []
+        for rank in ranks:
+            for size in sizes:
+                block = comb(n, size)
+                if rank < block:
+                    draws.append((size, rank))
+                    break
+                rank -= block
+    else:
+        draws = [
+            (size, rank)
+            for size, quota in quotas.items()
+            for rank in _floyd_sample(rng, comb(n, size), quota)
+        ]
+
+    rng.shuffle(draws)
+    return draws
+
+
+_WEIGHTED_TRIES = 100  # Weighted redraws before falling back to _draw_unseen
+
+
+def _sample_weighted(
+    rng: random.Random,
+    unit_weights: list[float],
+    k: int,
+    sizes: range,
+    quotas: dict[int, int] | None,
+) -> Iterator[tuple[int, ...]]:
+    """
+    Draw k distinct weighted combinations of range(len(unit_weights)).
+
+    Sizes are assigned as in the uniform path, so no size is asked for
+    more combinations than it has. Each draw then picks that many units
+    without replacement with probability proportional to weight
+    (Efraimidis-Spirakis keys), redrawing duplicates. A draw that keeps
+    hitting duplicates falls back to _draw_unseen, so exactly k
+    combinations are always yielded.
+    """
+    n = len(unit_weights)
+    if quotas is None:
+        schedule = [size for size, _ in _uniform_draws(rng, n, k, sizes, None)]
+    else:
+        schedule = [size for size in sizes for _ in range(quotas[size])]
+        rng.shuffle(schedule)
+
+    seen: set[tuple[int, ...]] = set()
+    taken = dict.fromkeys(sizes, 0)
+    for size in schedule:
+        for _ in range(_WEIGHTED_TRIES):
+            keys = sorted(
+                range(n),
+                key=lambda i: rng.random() ** (1.0 / unit_weights[i]),
+                reverse=True,
+            )
+            combo = tuple(sorted(keys[:size]))
+            if combo not in seen:
+                break
+        else:
+            combo = _draw_unseen(rng, unit_weights, size, taken[size], seen)
+        seen.add(combo)
+        taken[size] += 1
+        yield combo
+
+
+def _draw_unseen(
+    rng: random.Random,
+    unit_weights: list[float],
+    size: int,
+    taken: int,
+    seen: set[tuple[int, ...]],
+) -> tuple[int, ...]:
+    """
+    Draw a size-combination not in seen, when weighted draws keep repeating.
+
+    If at most half the space is unseen, the unseen combinations are listed
+    (there are no more than `taken` of them) and one is picked with
+    probability proportional to the product of its weights. Otherwise a
+    uniform rank is redrawn until it is new, which takes two tries on average.
+    """
+    n = len(unit_weights)
+    space = comb(n, size)
+    if space <= 2 * taken:
+        unseen = [combo for combo in combinations(range(n), size) if combo not in seen]
+        products = [prod(unit_weights[i] for i in combo) for combo in unseen]
+        return rng.choices(unseen, weights=products)[0]
+    while True:
+        combo = unrank_combination(n, size, rng.randrange(space))
+        if combo not in seen:
+            return combo
@@ -0,0 +1,200 @@
+"""
+Conditions - Declarative rules that include a unit based on compile values.
+
+A unit's `when` conditions must all hold for it to be included. Proteas
+compiles every unit's conditions into one DecisionTable: each compile is
+reduced to a signature (which variables are present and, for variables
+compared against constants, which constant they equal), and the set of
+excluded units is cached per signature.
+
+Usage:
+    PromptTemplateUnit(name="history", content="$history", when=[Present("history")])
+    PromptTemplateUnit(name="chat", content="...", when=[Equals("mode", "chat")])
+    PromptTemplateUnit(name="eu", content="...", when=[In("region", ("de", "fr"))])
+"""
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from proteas.unit import PromptTemplateUnit
+
+
+@dataclass(frozen=True)
+class Condition:
+    """
+    Base class for unit conditions on one input variable.
+
+    Subclasses implement evaluate() and constants().
+    """
+
+    variable: str
+
+    def evaluate(self, values: dict[str, Any]) -> bool:
+        """Return True if the condition holds for the compile values."""
+        raise NotImplementedError
+
+    def constants(self) -> tuple[Any, ...] | None:
+        """Constants the variable is compared to, or None if only presence matters."""
+        return None
+
+
+@dataclass(frozen=True)
+class Present(Condition):
+    """Holds when the variable is passed to compile."""
+
+    def evaluate(self, values):
+        return self.variable in values
+
+
+@dataclass(frozen=True)
+class Absent(Condition):
+    """Holds when the variable is not passed to compile."""
+
+    def evaluate(self, values):
+        return self.variable not in values
+
+
+@dataclass(frozen=True)
+class Equals(Condition):
+    """Holds when the variable is passed and equals value."""
+
+    value: Any = None
+
+    def evaluate(self, values):
+        return self.variable in values and values[self.variable] == self.value
+
+    def constants(self):
+        return (self.value,)
+
+
+@dataclass(frozen=True)
+class In(Condition):
+    """Holds when the variable is passed and is one of values."""
+
+    values: tuple[Any, ...] = ()
+
+    def __post_init__(self):
+        object.__setattr__(self, "values", tuple(self.values))
+
+    def evaluate(self, values):
+        return self.variable in values and values[self.variable] in self.values
+
+    def constants(self):
+        return self.values
+
+
+_MISSING = object()
+_OTHER = object()
+
+
+class DecisionTable:
+    """
+    All unit conditions of a Proteas, precompiled.
+
+    resolve() maps compile values to a signature and returns the ids of
+    the units whose conditions fail, evaluating conditions only the first
+    time a signature is seen. A variable compared against constants
+    contributes the matching constant (or "other") to the signature, so
+    the table stays bounded no matter how many distinct values are passed.
+    """
+
+    def __init__(self, units: list["PromptTemplateUnit"], maxsize: int = 1024):
+        """
+        Compile the conditions of units.
+
+        Args:
+            units: Units in any order; units with no conditions always apply
+            maxsize: Maximum cached signatures (cleared when full)
+        """
+        self.units = list(units)
+        self.maxsize = maxsize
+        self._whens = [unit.when for unit in self.units]
+        self._conditional = [unit for unit in self.units if unit.when]
+        self._cache: dict[tuple, frozenset[int]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # variable -> set of constants, or None when only presence matters
+        constants: dict[str, set | None] = {}
+        self._hashable = True
+        for unit in self._conditional:
+            for condition in unit.when:
+                found = condition.constants()
+                known = constants.setdefault(condition.variable, None)
+                if found is None:
+                    continue
+                try:
+                    constants[condition.variable] = (known or set()) | set(found)
+                except TypeError:  # unhashable constant: never cache
+                    self._hashable = False
+        self._variables = tuple(sorted(constants))
+        self._constants = tuple(
+            frozenset(constants[v]) if constants[v] is not None else None
+            for v in self._variables
+        )
+
+    def is_current(self, whens: list[tuple[Condition, ...]]) -> bool:
+        """True if the units' conditions (in unit order) are unchanged since compiling."""
+        return whens == self._whens
+
+    def _signature(self, values: dict[str, Any]) -> tuple | None:
+        """Reduce values to a cache key, or None if it cannot be cached."""
+        signature = []
+        for variable, constants in zip(self._variables, self._constants):
+            if variable not in values:
+                signature.append(_MISSING)
+            elif constants is None:
+                signature.append(True)
+            else:
+                value = values[variable]
+                try:
+                    signature.append(value if value in constants else _OTHER)
+                except TypeError:  # unhashable value
+                    return None
+        return tuple(signature)
+
+    def evaluate(self, values: dict[str, Any]) -> frozenset[int]:
+        """Evaluate every condition, returning the ids of excluded units."""
+        return frozenset(
+            id(unit) for unit in self._conditional
+            if not all(condition.evaluate(values) for condition in unit.when)
+        )
+
+    def resolve(self, values: dict[str, Any]) -> frozenset[int]:
+        """
+        Return the ids of units whose conditions fail for values.
+
+        Args:
+            values: The kwargs passed to compile
+        """
+        if not self._conditional:
+            return frozenset()
+        signature = self._signature(values) if self._hashable else None
+        if signature is None:
+            return self.evaluate(values)
+
+        excluded = self._cache.get(signature)
+        if excluded is not None:
+            self.hits += 1
+            return excluded
+
+        self.misses += 1
+        excluded = self.evaluate(values)
+        with self._lock:
+            if len(self._cache) >= self.maxsize:
+                self._cache.clear()
+            self._cache[signature] = excluded
+        return excluded
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __str__(self) -> str:
+        return (f"DecisionTable({len(self._conditional)} conditional units, "
+                f"{len(self._cache)} signatures)")
+
+    def __repr__(self) -> str:
+        return self.__str__()
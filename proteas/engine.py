@@ -0,0 +1,252 @@
+"""
+Engines - Strategies for assembling ordered units into one prompt.
+
+Proteas hands its sorted, enabled units to an engine. RenderEngine renders
+each unit with PromptTemplateUnit.render and joins the results; it is the
+default. SegmentEngine lowers the whole assembler into one flat program of
+literal text and placeholder slots, caches it, and renders every compile
+with a single join, producing exactly the same output.
+"""
+
+from string import Template
+from threading import Lock
+from typing import Any
+
+from proteas.unit import PromptTemplateUnit
+from proteas.instrumentation import Instrumentation
+
+
+class Engine:
+    """
+    Interface for assembling units into a prompt.
+
+    Subclasses implement assemble(). Output must match joining each
+    non-empty unit.render(**kwargs) with the separator.
+    """
+
+    def assemble(
+        self,
+        units: list[PromptTemplateUnit],
+        separator: str,
+        kwargs: dict[str, Any],
+        spans: list[tuple[str, int, int]] | None = None,
+        instrumentation: Instrumentation | None = None,
+    ) -> str:
+        """
+        Assemble units into a prompt.
+
+        Args:
+            units: Enabled units, already in prompt order
+            separator: String placed between non-empty units
+            kwargs: Values to fill placeholders
+            spans: If given, (unit_name, start, end) is appended per non-empty unit
+            instrumentation: Optional hooks to run around each unit render
+
+        Returns:
+            The combined prompt string
+        """
+        raise NotImplementedError
+
+
+class RenderEngine(Engine):
+    """Render each unit on its own, then join. The default engine."""
+
+    def assemble(self, units, separator, kwargs, spans=None, instrumentation=None):
+        rendered = []
+        offset = 0
+        separator_length = len(separator)
+        for unit in units:
+            if instrumentation is None:
+                content = unit.render(**kwargs)
+            else:
+                content = instrumentation.render(unit, kwargs)
+            if content:  # Skip empty renders
+                if spans is not None:
+                    if rendered:
+                        offset += separator_length
+                    spans.append((unit.name, offset, offset + len(content)))
+                    offset += len(content)
+                rendered.append(content)
+
+        return separator.join(rendered)
+
+
+class _Slot:
+    """A placeholder in a compiled program: its name and its original text."""
+
+    __slots__ = ("name", "text")
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+
+
+class _UnitProgram:
+    """
+    One unit lowered to segments.
+
+    Attributes:
+        raw: The unit's output when compiled without kwargs
+        segments: Literal strings and _Slots used when kwargs are given
+        may_be_empty: True if the segments are all slots, so the unit
+                      renders empty when every slot fills with ""
+    """
+
+    __slots__ = ("raw", "segments", "may_be_empty")
+
+    def __init__(self, unit: PromptTemplateUnit):
+        parts: list[list[str | _Slot]] = []
+        if unit.prefix:
+            parts.append([unit.prefix])
+        if unit.content:
+            parts.append(_parse(unit.content))
+        if unit.suffix:
+            parts.append([unit.suffix])
+
+        raw = []
+        if unit.prefix:
+            raw.append(unit.prefix)
+        if unit.content:
+            raw.append(unit.content)
+        if unit.suffix:
+            raw.append(unit.suffix)
+        self.raw = "\n".join(raw)
+
+        # Join parts with "\n", merging neighbouring literals
+        segments: list[str | _Slot] = []
+        for i, part in enumerate(parts):
+            for segment in ["\n"] + part if i else part:
+                if segments and type(segment) is str and type(segments[-1]) is str:
+                    segments[-1] += segment
+                else:
+                    segments.append(segment)
+        self.segments = tuple(s for s in segments if s != "")
+        self.may_be_empty = all(type(s) is _Slot for s in self.segments)
+
+
+def _parse(content: str) -> list[str | _Slot]:
+    """Split content the way Template.safe_substitute scans it."""
+    segments: list[str | _Slot] = []
+    literal = []
+    position = 0
+    for match in Template.pattern.finditer(content):
+        literal.append(content[position:match.start()])
+        position = match.end()
+        named = match.group("named") or match.group("braced")
+        if named is not None:
+            segments.append("".join(literal))
+            segments.append(_Slot(named, match.group()))
+            literal = []
+        elif match.group("escaped") is not None:
+            literal.append(Template.delimiter)
+        else:  # invalid: left unchanged
+            literal.append(match.group())
+    literal.append(content[position:])
+    segments.append("".join(literal))
+    return segments
+
+
+class SegmentEngine(Engine):
+    """
+    Lower the whole assembler into one flat segment program.
+
+    Prefixes, suffixes, content literals and separators become literal
+    segments; placeholders become slots. Programs are cached by unit text,
+    so repeated compiles of the same layout skip parsing entirely and write
+    every piece straight into one output list. Unknown placeholders and
+    invalid "$" are left unchanged and "$$" becomes "$", exactly like
+    safe_substitute; without kwargs, content is used verbatim, like render.
+
+    Usage:
+        engine = SegmentEngine()
+        p = Proteas(engine=engine)   # an engine can be shared by many Proteas
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Initialize the engine.
+
+        Args:
+            maxsize: Maximum number of cached programs (oldest evicted first)
+        """
+        self.maxsize = maxsize
+        self._programs: dict[tuple, tuple[_UnitProgram, ...]] = {}
+        self._lock = Lock()
+
+    def program(
+        self,
+        units: list[PromptTemplateUnit],
+        instrumentation: Instrumentation | None = None,
+    ) -> tuple[_UnitProgram, ...]:
+        """Return the cached program for units, compiling it on a miss."""
+        key = tuple((unit.prefix, unit.content, unit.suffix) for unit in units)
+        program = self._programs.get(key)
+        if program is not None:
+            if instrumentation is not None:
+                for unit in units:
+                    instrumentation.cache_hit(unit)
+            return program
+
+        program = tuple(_UnitProgram(unit) for unit in units)
+        with self._lock:
+            if len(self._programs) >= self.maxsize:
+                del self._programs[next(iter(self._programs))]
+            self._programs[key] = program
+        return program
+
+    def clear(self) -> None:
+        """Drop all cached programs."""
+        with self._lock:
+            self._programs.clear()
+
+    def assemble(self, units, separator, kwargs, spans=None, instrumentation=None):
+        program = self.program(units, instrumentation)
+        out: list[str] = []
+        append = out.append
+        separator_length = len(separator)
+        offset = 0
+
+        for unit, compiled in zip(units, program):
+            if instrumentation is not None:
+                start = instrumentation.begin_render(unit, kwargs)
+            mark = len(out)
+
+            if not kwargs:
+                if compiled.raw:
+                    if mark:
+                        append(separator)
+                    append(compiled.raw)
+            elif compiled.segments:
+                if mark:
+                    append(separator)
+                for segment in compiled.segments:
+                    if type(segment) is str:
+                        append(segment)
+                    elif segment.name in kwargs:
+                        append(str(kwargs[segment.name]))
+                    else:
+                        append(segment.text)
+                if compiled.may_be_empty and not any(out[mark + bool(mark):]):
+                    del out[mark:]
+
+            if instrumentation is not None or spans is not None:
+                body = mark + 1 if mark and len(out) > mark else mark
+                if spans is not None and len(out) > mark:
+                    length = sum(map(len, out[body:]))
+                    if mark:
+                        offset += separator_length
+                    spans.append((unit.name, offset, offset + length))
+                    offset += length
+                if instrumentation is not None:
+                    instrumentation.end_render(unit, kwargs, "".join(out[body:]), start)
+
+        return "".join(out)
+
+    def __len__(self) -> int:
+        return len(self._programs)
+
+    def __str__(self) -> str:
+        return f"SegmentEngine({len(self._programs)}/{self.maxsize} programs cached)"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,294 @@
+"""
+Instrumentation - Optional timing and size hooks for compile and render.
+
+Attach an Instrumentation to a Proteas to observe every compile and every
+unit render. When no instrumentation is attached, compile takes its normal
+path and pays nothing beyond a single None check.
+"""
+
+from dataclasses import dataclass
+from string import Template
+from time import perf_counter
+from typing import Any, Callable
+
+from proteas.unit import PromptTemplateUnit
+
+
+def count_substitutions(content: str, values: dict[str, Any]) -> int:
+    """
+    Count the placeholders in content that values would fill.
+
+    Args:
+        content: Unit content using $variable / ${variable} placeholders
+        values: The kwargs passed to render
+
+    Returns:
+        Number of placeholder occurrences with a matching value
+    """
+    if not content or not values:
+        return 0
+    count = 0
+    for match in Template.pattern.finditer(content):
+        named = match.group("named") or match.group("braced")
+        if named is not None and named in values:
+            count += 1
+    return count
+
+
+@dataclass
+class UnitStats:
+    """
+    Accumulated render statistics for one unit name.
+
+    Attributes:
+        renders: Number of times the unit was rendered
+        total_time: Total render time in seconds
+        max_time: Slowest single render in seconds
+        total_chars: Total characters produced
+        max_chars: Largest single output in characters
+        substitutions: Total placeholders filled
+        cache_hits: Renders served from a cached plan
+    """
+
+    renders: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    total_chars: int = 0
+    max_chars: int = 0
+    substitutions: int = 0
+    cache_hits: int = 0
+
+    @property
+    def mean_time(self) -> float:
+        """Average render time in seconds."""
+        return self.total_time / self.renders if self.renders else 0.0
+
+    def as_dict(self) -> dict[str, float | int]:
+        """Return the stats as a plain dict."""
+        return {
+            "renders": self.renders,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "max_time": self.max_time,
+            "total_chars": self.total_chars,
+            "max_chars": self.max_chars,
+            "substitutions": self.substitutions,
+            "cache_hits": self.cache_hits,
+        }
+
+
+class RenderStats:
+    """
+    Built-in collector for per-unit and per-compile statistics.
+
+    Usage:
+        stats = RenderStats()
+        p = Proteas(instrumentation=Instrumentation(stats=stats))
+        p.compile(data="...")
+        stats.summary()        # plain dict
+        stats.to_prometheus()  # Prometheus text exposition format
+    """
+
+    def __init__(self):
+        self.units: dict[str, UnitStats] = {}
+        self.compiles: int = 0
+        self.compile_time: float = 0.0
+        self.max_compile_time: float = 0.0
+        self.compile_chars: int = 0
+        self.max_compile_chars: int = 0
+
+    def record_render(
+        self,
+        unit: PromptTemplateUnit,
+        output: str,
+        elapsed: float,
+        substitutions: int,
+    ) -> None:
+        """Record a single unit render."""
+        stats = self.units.get(unit.name)
+        if stats is None:
+            stats = self.units[unit.name] = UnitStats()
+        size = len(output)
+        stats.renders += 1
+        stats.total_time += elapsed
+        stats.total_chars += size
+        stats.substitutions += substitutions
+        if elapsed > stats.max_time:
+            stats.max_time = elapsed
+        if size > stats.max_chars:
+            stats.max_chars = size
+
+    def record_cache_hit(self, unit: PromptTemplateUnit) -> None:
+        """Record that a unit was served from a cached plan."""
+        stats = self.units.get(unit.name)
+        if stats is None:
+            stats = self.units[unit.name] = UnitStats()
+        stats.cache_hits += 1
+
+    def record_compile(self, output: str, elapsed: float) -> None:
+        """Record a full compile."""
+        size = len(output)
+        self.compiles += 1
+        self.compile_time += elapsed
+        self.compile_chars += size
+        if elapsed > self.max_compile_time:
+            self.max_compile_time = elapsed
+        if size > self.max_compile_chars:
+            self.max_compile_chars = size
+
+    def reset(self) -> None:
+        """Discard all recorded statistics."""
+        self.__init__()
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Export all statistics as a plain dict.
+
+        Returns:
+            {"compiles": ..., "compile_time": ..., ..., "units": {name: {...}}}
+        """
+        return {
+            "compiles": self.compiles,
+            "compile_time": self.compile_time,
+            "max_compile_time": self.max_compile_time,
+            "compile_chars": self.compile_chars,
+            "max_compile_chars": self.max_compile_chars,
+            "units": {name: s.as_dict() for name, s in self.units.items()},
+        }
+
+    def to_prometheus(self, prefix: str = "proteas") -> str:
+        """
+        Export all statistics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix (default: "proteas")
+
+        Returns:
+            The metrics text, one sample per line
+        """
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list[tuple[str, Any]]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{labels} {value}")
+
+        metric("compiles_total", "counter", "Number of compiles.",
+               [("", self.compiles)])
+        metric("compile_seconds_total", "counter", "Total compile time.",
+               [("", self.compile_time)])
+        metric("compile_seconds_max", "gauge", "Slowest compile.",
+               [("", self.max_compile_time)])
+        metric("compile_output_chars_total", "counter", "Total compiled prompt size.",
+               [("", self.compile_chars)])
+        metric("compile_output_chars_max", "gauge", "Largest compiled prompt.",
+               [("", self.max_compile_chars)])
+
+        units = [(_label(name), s) for name, s in self.units.items()]
+        metric("unit_renders_total", "counter", "Number of unit renders.",
+               [(labels, s.renders) for labels, s in units])
+        metric("unit_render_seconds_total", "counter", "Total unit render time.",
+               [(labels, s.total_time) for labels, s in units])
+        metric("unit_render_seconds_max", "gauge", "Slowest unit render.",
+               [(labels, s.max_time) for labels, s in units])
+        metric("unit_output_chars_total", "counter", "Total unit output size.",
+               [(labels, s.total_chars) for labels, s in units])
+        metric("unit_output_chars_max", "gauge", "Largest unit output.",
+               [(labels, s.max_chars) for labels, s in units])
+        metric("unit_substitutions_total", "counter", "Placeholders filled.",
+               [(labels, s.substitutions) for labels, s in units])
+        metric("unit_cache_hits_total", "counter", "Renders served from a cached plan.",
+               [(labels, s.cache_hits) for labels, s in units])
+
+        return "\n".join(lines) + "\n"
+
+    def __str__(self) -> str:
+        return f"RenderStats({self.compiles} compiles, {len(self.units)} units)"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def _label(name: str) -> str:
+    """Format a unit name as a Prometheus label set."""
+    escaped = name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'{{unit="{escaped}"}}'
+
+
+class Instrumentation:
+    """
+    Pre/post hooks around Proteas.compile and each unit render.
+
+    Hook signatures:
+        pre_compile(proteas, kwargs)
+        post_compile(proteas, prompt, elapsed)
+        pre_render(unit, kwargs)
+        post_render(unit, output, elapsed)
+
+    Usage:
+        instr = Instrumentation(stats=RenderStats())
+        instr.post_render.append(lambda unit, out, t: log(unit.name, t))
+        p = Proteas(instrumentation=instr)
+    """
+
+    def __init__(self, stats: RenderStats | None = None):
+        """
+        Initialize the instrumentation.
+
+        Args:
+            stats: Optional collector that records every compile and render
+        """
+        self.stats = stats
+        self.pre_compile: list[Callable[..., None]] = []
+        self.post_compile: list[Callable[..., None]] = []
+        self.pre_render: list[Callable[..., None]] = []
+        self.post_render: list[Callable[..., None]] = []
+
+    def begin_compile(self, proteas: Any, kwargs: dict[str, Any]) -> float:
+        """Run pre-compile hooks and return the start time."""
+        for hook in self.pre_compile:
+            hook(proteas, kwargs)
+        return perf_counter()
+
+    def end_compile(self, proteas: Any, prompt: str, start: float) -> None:
+        """Record the compile and run post-compile hooks."""
+        elapsed = perf_counter() - start
+        if self.stats is not None:
+            self.stats.record_compile(prompt, elapsed)
+        for hook in self.post_compile:
+            hook(proteas, prompt, elapsed)
+
+    def begin_render(self, unit: PromptTemplateUnit, kwargs: dict[str, Any]) -> float:
+        """Run pre-render hooks and return the start time."""
+        for hook in self.pre_render:
+            hook(unit, kwargs)
+        return perf_counter()
+
+    def end_render(
+        self,
+        unit: PromptTemplateUnit,
+        kwargs: dict[str, Any],
+        output: str,
+        start: float,
+    ) -> None:
+        """Record the render and run post-render hooks."""
+        elapsed = perf_counter() - start
+        if self.stats is not None:
+            self.stats.record_render(
+                unit, output, elapsed, count_substitutions(unit.content, kwargs)
+            )
+        for hook in self.post_render:
+            hook(unit, output, elapsed)
+
+    def cache_hit(self, unit: PromptTemplateUnit) -> None:
+        """Record that a unit was served from a cached plan."""
+        if self.stats is not None:
+            self.stats.record_cache_hit(unit)
+
+    def render(self, unit: PromptTemplateUnit, kwargs: dict[str, Any]) -> str:
+        """Render a unit with hooks and stats around it."""
+        start = self.begin_render(unit, kwargs)
+        output = unit.render(**kwargs)
+        self.end_render(unit, kwargs, output, start)
+        return output
@@ -0,0 +1,225 @@
+"""
+Pipeline - Feed rendered combinations to an async consumer with backpressure.
+
+Combinations are compiled off the event loop (in an executor), queued in a
+bounded buffer, and handed to a user coroutine by a fixed number of
+workers. Results are yielded in completion order. When consumers fall
+behind the buffer fills and rendering stalls, so memory stays flat no
+matter how large the combination space is.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
+from proteas.proteas import Proteas
+
+Consumer = Callable[[tuple[str, ...], str], Awaitable[Any]]
+
+_DONE = object()
+
+
+@dataclass
+class PipelineProgress:
+    """
+    Live counters for a running pipeline.
+
+    Attributes:
+        rendered: Combinations compiled so far
+        queued: Prompts waiting for a worker
+        in_flight: Prompts currently in the consumer
+        consumed: Consumer calls that returned
+        failed: Consumer calls that raised
+    """
+
+    rendered: int = 0
+    queued: int = 0
+    in_flight: int = 0
+    consumed: int = 0
+    failed: int = 0
+
+    @property
+    def completed(self) -> int:
+        """Consumer calls finished, successfully or not."""
+        return self.consumed + self.failed
+
+
+@dataclass
+class PipelineResult:
+    """
+    Outcome of one consumer call.
+
+    Attributes:
+        names: Unit names of the combination
+        prompt: The compiled prompt passed to the consumer
+        value: What the consumer returned (None if it raised)
+        error: The exception the consumer raised, if any
+        elapsed: Seconds spent in the consumer
+    """
+
+    names: tuple[str, ...]
+    prompt: str
+    value: Any = None
+    error: Exception | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class CombinationPipeline:
+    """
+    Render combinations off-loop and stream them through an async consumer.
+
+    The source is any iterable of (names, Proteas) pairs, such as
+    generate_combinations, sample_combinations or a CombinationIndex.
+    A pipeline can be iterated once.
+
+    Usage:
+        async def ask(names, prompt):
+            return await llm.complete(prompt)
+
+        pipeline = CombinationPipeline(
+            generate_combinations(units, max_size=3), ask,
+            concurrency=8, messages=sample,
+        )
+        async for result in pipeline:
+            print(result.names, result.value, pipeline.progress.completed)
+    """
+
+    def __init__(
+        self,
+        source: Iterable[tuple[tuple[str, ...], Proteas]],
+        consumer: Consumer,
+        *,
+        concurrency: int = 4,
+        buffer_size: int | None = None,
+        executor: Executor | None = None,
+        **kwargs,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            source: Iterable of (unit_names, proteas_instance)
+            consumer: Coroutine function called as consumer(names, prompt)
+            concurrency: Maximum concurrent consumer calls (default: 4)
+            buffer_size: Maximum rendered prompts waiting for a consumer
+                         (default: concurrency)
+            executor: Executor for rendering (default: the loop's default)
+            **kwargs: Values to fill placeholders, passed to every compile
+
+        Raises:
+            ValueError: If concurrency or buffer_size is less than 1
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if buffer_size is not None and buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        self.source = source
+        self.consumer = consumer
+        self.concurrency = concurrency
+        self.buffer_size = buffer_size if buffer_size is not None else concurrency
+        self.executor = executor
+        self.kwargs = kwargs
+        self.progress = PipelineProgress()
+
+    def __aiter__(self) -> AsyncIterator[PipelineResult]:
+        return self._run()
+
+    async def _run(self) -> AsyncIterator[PipelineResult]:
+        loop = asyncio.get_running_loop()
+        progress = self.progress
+        iterator = iter(self.source)
+        prompts: asyncio.Queue = asyncio.Queue(maxsize=self.buffer_size)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        failure: list[BaseException] = []
+        crashed: list[BaseException] = []
+        closing = False
+
+        def render_next():
+            for names, p in iterator:
+                return names, p.compile(**self.kwargs)
+            return None
+
+        async def produce():
+            try:
+                while True:
+                    item = await loop.run_in_executor(self.executor, render_next)
+                    if item is None:
+                        break
+                    progress.rendered += 1
+                    progress.queued += 1
+                    await prompts.put(item)  # Blocks while consumers are behind
+            except Exception as e:
+                failure.append(e)
+            except BaseException as e:  # e.g. CancelledError from a render
+                if not closing:
+                    crashed.append(e)
+                raise
+            finally:
+                if not closing:  # Always release the workers
+                    for _ in range(self.concurrency):
+                        await prompts.put(_DONE)
+
+        async def work():
+            try:
+                while True:
+                    item = await prompts.get()
+                    if item is _DONE:
+                        return
+                    names, prompt = item
+                    progress.queued -= 1
+                    progress.in_flight += 1
+                    start = perf_counter()
+                    try:
+                        value = await self.consumer(names, prompt)
+                    except Exception as e:
+                        result = PipelineResult(names, prompt, error=e,
+                                                elapsed=perf_counter() - start)
+                        progress.failed += 1
+                    except BaseException as e:  # e.g. CancelledError from the consumer
+                        if not closing:
+                            crashed.append(e)
+                        raise
+                    else:
+                        result = PipelineResult(names, prompt, value,
+                                                elapsed=perf_counter() - start)
+                        progress.consumed += 1
+                    finally:
+                        progress.in_flight -= 1
+                    await results.put(result)
+            finally:
+                if not closing:  # Always report, or _run waits forever
+                    await results.put(_DONE)
+
+        tasks = [asyncio.ensure_future(produce())]
+        tasks += [asyncio.ensure_future(work()) for _ in range(self.concurrency)]
+        try:
+            finished = 0
+            while finished < self.concurrency:
+                result = await results.get()
+                if result is _DONE:
+                    if crashed:
+                        raise crashed[0]
+                    finished += 1
+                else:
+                    yield result
+            if failure:
+                raise failure[0]
+        finally:
+            closing = True
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __str__(self) -> str:
+        p = self.progress
+        return (f"CombinationPipeline(rendered={p.rendered}, completed={p.completed}, "
+                f"concurrency={self.concurrency})")
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -5,6 +5,12 @@ Combines multiple PromptTemplateUnits into a single prompt.
 """
 
 from proteas.unit import PromptTemplateUnit
+from proteas.instrumentation import Instrumentation
+from proteas.engine import Engine, RenderEngine
+from proteas.conditions import DecisionTable
+
+# (unit name, start, end) offsets of a unit's text within a compiled prompt
+Span = tuple[str, int, int]
 
 
 class Proteas:
@@ -23,16 +29,29 @@ class Proteas:
             .compile())
     """
 
-    def __init__(self, separator: str = "\n\n"):
+    def __init__(
+        self,
+        separator: str = "\n\n",
+        instrumentation: Instrumentation | None = None,
+        engine: Engine | None = None,
+    ):
         """
         Initialize the combiner.
 
         Args:
             separator: String to join units with (default: double newline)
+            instrumentation: Optional hooks and stats around compile and
+                             each unit render (default: None, no overhead)
+            engine: How units are assembled (default: RenderEngine).
+                    SegmentEngine renders the whole prompt in one pass.
         """
         self._units: list[tuple[int, PromptTemplateUnit]] = []
         self._insertion_counter: int = 0
         self.separator = separator
+        self.instrumentation = instrumentation
+        self.engine = engine if engine is not None else RenderEngine()
+        self._decision_table: DecisionTable | None = None
+        self._conditional_units: int = 0  # Units added with a `when`
 
     def add(self, unit: PromptTemplateUnit) -> "Proteas":
         """
@@ -46,6 +65,9 @@ class Proteas:
         """
         self._units.append((self._insertion_counter, unit))
         self._insertion_counter += 1
+        self._decision_table = None
+        if unit.when:
+            self._conditional_units += 1
         return self
 
     def add_many(self, units: list[PromptTemplateUnit]) -> "Proteas":
@@ -62,7 +84,12 @@ class Proteas:
             self.add(unit)
         return self
 
-    def compile(self, **kwargs) -> str:
+    def compile(
+        self,
+        *,
+        with_spans: bool = False,
+        **kwargs,
+    ) -> str | tuple[str, list[Span]]:
         """
         Assemble all enabled units into a single prompt.
 
@@ -70,12 +97,19 @@ class Proteas:
         1. Explicit order (if set)
         2. Insertion order (if order is None)
 
+        Units whose `when` conditions fail for kwargs are skipped, like
+        disabled units.
+
         Args:
+            with_spans: Also return where each unit landed in the prompt
             **kwargs: Values to fill placeholders in unit content.
                       e.g., compile(messages="...") fills {messages} in any unit
 
         Returns:
-            The combined prompt string
+            The combined prompt string. With with_spans=True, a tuple of
+            (prompt, spans) where spans is a list of (unit_name, start, end)
+            in prompt order, so prompt[start:end] is that unit's text.
+            Offsets index the str; units that render empty have no span.
         """
         # Sort units: explicit order first, then insertion order for ties/None
         sorted_units = sorted(
@@ -86,15 +120,32 @@ class Proteas:
             )
         )
 
-        # Render enabled units
-        rendered = []
-        for _, unit in sorted_units:
-            if unit.enabled:
-                content = unit.render(**kwargs)
-                if content:  # Skip empty renders
-                    rendered.append(content)
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = instrumentation.begin_compile(self, kwargs)
+
+        # The decision table is only consulted once a unit with conditions is added
+        excluded = self.decision_table.resolve(kwargs) if self._conditional_units else None
+        if excluded:
+            units = [unit for _, unit in sorted_units
+                     if unit.enabled and id(unit) not in excluded]
+        else:
+            units = [unit for _, unit in sorted_units if unit.enabled]
+
+        spans: list[Span] | None = [] if with_spans else None
+        prompt = self.engine.assemble(
+            units,
+            self.separator,
+            kwargs,
+            spans,
+            instrumentation,
+        )
 
-        return self.separator.join(rendered)
+        if instrumentation is not None:
+            instrumentation.end_compile(self, prompt, start)
+        if with_spans:
+            return prompt, spans
+        return prompt
 
     def get_unit(self, name: str) -> PromptTemplateUnit | None:
         """
@@ -122,6 +173,8 @@ class Proteas:
             Self for method chaining
         """
         self._units = [(i, u) for i, u in self._units if u.name != name]
+        self._decision_table = None
+        self._conditional_units = sum(1 for _, u in self._units if u.when)
         return self
 
     def clear(self) -> "Proteas":
@@ -133,6 +186,8 @@ class Proteas:
         """
         self._units = []
         self._insertion_counter = 0
+        self._decision_table = None
+        self._conditional_units = 0
         return self
 
     def enable(self, name: str) -> "Proteas":
@@ -165,6 +220,14 @@ class Proteas:
             unit.disable()
         return self
 
+    @property
+    def decision_table(self) -> DecisionTable:
+        """Precompiled unit conditions, rebuilt when units or conditions change."""
+        table = self._decision_table
+        if table is None or not table.is_current([unit.when for _, unit in self._units]):
+            table = self._decision_table = DecisionTable(self.units)
+        return table
+
     @property
     def units(self) -> list[PromptTemplateUnit]:
         """Get all units in insertion order."""
@@ -0,0 +1,439 @@
+"""
+Compile service - A local daemon that keeps Proteas layouts warm.
+
+One process loads the layouts once, shares a SegmentEngine across them so
+compiled programs stay cached, and answers compile requests over a Unix
+socket or a localhost TCP port. Worker processes use CompileClient, which
+mirrors Proteas.compile. Standard library only.
+
+Protocol: one JSON object per line in each direction.
+
+Usage:
+    # prompts.py
+    def load_layouts() -> dict[str, Proteas]:
+        return {"chat": Proteas().add_many(chat_units)}
+
+    $ python -m proteas.service prompts:load_layouts --socket /tmp/proteas.sock
+
+    client = CompileClient("/tmp/proteas.sock")
+    prompt = client.compile("chat", messages="...")
+    client.last_latency        # Server-side compile time in seconds
+    client.reload()            # Re-run load_layouts without restarting
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from time import perf_counter
+from typing import Any, Callable
+
+from proteas.proteas import Proteas
+from proteas.engine import SegmentEngine
+from proteas.instrumentation import Instrumentation, RenderStats
+
+Address = str | tuple[str, int]
+
+
+class ServiceError(RuntimeError):
+    """Raised by CompileClient when the server reports a failed request."""
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answer newline-delimited JSON requests until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.service.dispatch(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def service_actions(self):
+        self.service.service_actions()
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def service_actions(self):
+        self.service.service_actions()
+
+
+class CompileServer:
+    """
+    Serve compile requests for a set of named Proteas layouts.
+
+    Every loaded layout gets the server's shared SegmentEngine and is
+    compiled once at load, so its program is cached before the first
+    request arrives.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], dict[str, Proteas]],
+        address: Address,
+        engine: SegmentEngine | None = None,
+        stats: RenderStats | None = None,
+    ):
+        """
+        Initialize the server and load layouts.
+
+        Args:
+            loader: Returns {layout_name: Proteas}; called again on reload
+            address: Unix socket path, or (host, port) for localhost TCP
+            engine: Engine shared by all layouts (default: new SegmentEngine)
+            stats: Optional collector attached to every layout
+        """
+        self.loader = loader
+        self.address = address
+        self.engine = engine if engine is not None else SegmentEngine()
+        self.stats = stats
+        self.layouts: dict[str, Proteas] = {}
+        self._server: socketserver.BaseServer | None = None
+        self._thread: threading.Thread | None = None
+        self._reload_requested = False
+        self.reload()
+
+    def reload(self) -> list[str]:
+        """
+        Reload layouts from the loader and warm their programs.
+
+        In-flight requests finish against the previous layouts.
+
+        Returns:
+            The loaded layout names
+        """
+        instrumentation = Instrumentation(stats=self.stats) if self.stats is not None else None
+        layouts = self.loader()
+        self.engine.clear()
+        for p in layouts.values():
+            p.engine = self.engine
+            p.instrumentation = None
+            p.compile()  # Caches the layout's program
+            p.instrumentation = instrumentation
+        self.layouts = layouts
+        return list(layouts)
+
+    def request_reload(self) -> None:
+        """
+        Ask the serving loop to reload on its next pass.
+
+        Safe to call from a signal handler. If the loader fails, the error
+        is reported on stderr and the previous layouts stay in service.
+        """
+        self._reload_requested = True
+
+    def service_actions(self) -> None:
+        """Run a requested reload. Called by the serving loop between requests."""
+        if not self._reload_requested:
+            return
+        self._reload_requested = False
+        try:
+            names = self.reload()
+        except Exception as e:
+            print(f"Reload failed, keeping previous layouts: {type(e).__name__}: {e}",
+                  file=sys.stderr)
+        else:
+            print(f"Reloaded {len(names)} layouts", file=sys.stderr)
+
+    def compile(self, layout: str, kwargs: dict[str, Any], with_spans: bool = False) -> dict[str, Any]:
+        """Compile one layout, returning the response payload."""
+        start = perf_counter()
+        result = self.layouts[layout].compile(with_spans=with_spans, **kwargs)
+        elapsed = perf_counter() - start
+        if with_spans:
+            prompt, spans = result
+            return {"ok": True, "prompt": prompt, "spans": spans, "elapsed": elapsed}
+        return {"ok": True, "prompt": result, "elapsed": elapsed}
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Handle one decoded request."""
+        op = request.get("op")
+        if op == "compile":
+            return self.compile(
+                request["layout"], request.get("kwargs", {}), request.get("with_spans", False)
+            )
+        if op == "batch":
+            start = perf_counter()
+            results = []
+            for item in request["items"]:
+                try:
+                    results.append(self.compile(
+                        item["layout"], item.get("kwargs", {}), item.get("with_spans", False)
+                    ))
+                except Exception as e:
+                    results.append({"ok": False, "error": f"{type(e).__name__}: {e}"})
+            return {"ok": True, "results": results, "elapsed": perf_counter() - start}
+        if op == "reload":
+            return {"ok": True, "layouts": self.reload()}
+        if op == "layouts":
+            return {"ok": True, "layouts": list(self.layouts)}
+        if op == "stats":
+            summary = self.stats.summary() if self.stats is not None else None
+            return {"ok": True, "stats": summary}
+        if op == "metrics":
+            text = self.stats.to_prometheus() if self.stats is not None else ""
+            return {"ok": True, "metrics": text}
+        if op == "ping":
+            return {"ok": True}
+        raise ValueError(f"Unknown op: {op!r}")
+
+    def _bind(self) -> socketserver.BaseServer:
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            server = _UnixServer(self.address, _Handler)
+        else:
+            server = _TCPServer(self.address, _Handler)
+            self.address = server.server_address[:2]
+        server.service = self
+        return server
+
+    def serve_forever(self) -> None:
+        """Bind and serve in the current thread until shutdown()."""
+        self._server = self._bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    def start(self) -> "CompileServer":
+        """Bind and serve in a background thread. Returns self."""
+        self._server = self._bind()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        """Stop serving and remove the Unix socket, if any."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        if self._thread is not None:
+            self._server.server_close()
+            self._thread.join()
+            self._thread = None
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+        self._server = None
+
+    def __enter__(self) -> "CompileServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def __str__(self) -> str:
+        return f"CompileServer({len(self.layouts)} layouts, address={self.address!r})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class CompileClient:
+    """
+    Thin client for CompileServer that mirrors Proteas.compile.
+
+    Holds one connection, opened on first use. Use one client per thread.
+    """
+
+    def __init__(self, address: Address, timeout: float | None = 30.0):
+        """
+        Initialize the client.
+
+        Args:
+            address: Unix socket path, or (host, port)
+            timeout: Socket timeout in seconds
+        """
+        self.address = address
+        self.timeout = timeout
+        self.last_latency: float | None = None
+        self.last_round_trip: float | None = None
+        self.last_latencies: list[float | None] = []
+        self._socket: socket.socket | None = None
+        self._file = None
+
+    def _connect(self) -> None:
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+        else:
+            sock = socket.create_connection(tuple(self.address), timeout=self.timeout)
+        self._socket = sock
+        self._file = sock.makefile("rwb")
+
+    def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """
+        Send one request and return the decoded response.
+
+        Any transport failure (including a timeout) closes the connection,
+        so a late reply is never read as the answer to the next request.
+
+        Raises:
+            ServiceError: If the server reports a failure
+        """
+        if self._socket is None:
+            self._connect()
+        start = perf_counter()
+        try:
+            self._file.write(json.dumps(payload).encode() + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        except BaseException:
+            self.close()
+            raise
+        self.last_round_trip = perf_counter() - start
+        if not line:
+            self.close()
+            raise ServiceError("Connection closed by server")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ServiceError(response.get("error", "Unknown error"))
+        return response
+
+    def compile(self, layout: str, *, with_spans: bool = False, **kwargs):
+        """
+        Compile a layout on the server.
+
+        Args:
+            layout: Layout name
+            with_spans: Also return (unit_name, start, end) spans
+            **kwargs: Values to fill placeholders (must be JSON-serializable)
+
+        Returns:
+            The prompt, or (prompt, spans) with with_spans=True
+        """
+        response = self.request(
+            {"op": "compile", "layout": layout, "kwargs": kwargs, "with_spans": with_spans}
+        )
+        self.last_latency = response["elapsed"]
+        if with_spans:
+            return response["prompt"], [tuple(span) for span in response["spans"]]
+        return response["prompt"]
+
+    def compile_batch(self, items: list[tuple[str, dict[str, Any]]]) -> list[str]:
+        """
+        Compile many layouts in one round trip.
+
+        Args:
+            items: List of (layout, kwargs)
+
+        Returns:
+            Prompts in request order. Per-item server latencies are in
+            last_latencies.
+
+        Raises:
+            ServiceError: If any item failed
+        """
+        response = self.request({
+            "op": "batch",
+            "items": [{"layout": layout, "kwargs": kwargs} for layout, kwargs in items],
+        })
+        self.last_latency = response["elapsed"]
+        self.last_latencies = [result.get("elapsed") for result in response["results"]]
+        prompts = []
+        for (layout, _), result in zip(items, response["results"]):
+            if not result["ok"]:
+                raise ServiceError(f"{layout}: {result['error']}")
+            prompts.append(result["prompt"])
+        return prompts
+
+    def reload(self) -> list[str]:
+        """Reload layouts on the server. Returns the layout names."""
+        return self.request({"op": "reload"})["layouts"]
+
+    def layouts(self) -> list[str]:
+        """Names of the layouts the server holds."""
+        return self.request({"op": "layouts"})["layouts"]
+
+    def stats(self) -> dict[str, Any] | None:
+        """RenderStats summary, or None if the server runs without stats."""
+        return self.request({"op": "stats"})["stats"]
+
+    def metrics(self) -> str:
+        """RenderStats in Prometheus text format ("" without stats)."""
+        return self.request({"op": "metrics"})["metrics"]
+
+    def ping(self) -> bool:
+        """Check that the server answers."""
+        return self.request({"op": "ping"})["ok"]
+
+    def close(self) -> None:
+        """Close the connection. The next request reconnects."""
+        if self._socket is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+            self._file = None
+
+    def __enter__(self) -> "CompileClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        return f"CompileClient(address={self.address!r})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def _resolve_loader(target: str) -> Callable[[], dict[str, Proteas]]:
+    """Import "package.module:function"."""
+    module_name, _, attr = target.partition(":")
+    if not attr:
+        raise ValueError(f"Loader must look like 'module:function', got {target!r}")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve warm Proteas layouts locally.")
+    parser.add_argument("loader", help="'module:function' returning {name: Proteas}")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--socket", help="Unix socket path")
+    group.add_argument("--port", type=int, help="TCP port on --host")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--stats", action="store_true", help="Collect RenderStats")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    address: Address = args.socket if args.socket else (args.host, args.port)
+    server = CompileServer(
+        _resolve_loader(args.loader),
+        address,
+        stats=RenderStats() if args.stats else None,
+    )
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda *_: server.request_reload())
+    print(f"Serving {len(server.layouts)} layouts on {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
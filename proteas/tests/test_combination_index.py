@@ -0,0 +1,101 @@
+"""Tests for the bitmask combination index."""
+
+import pytest
+from proteas.unit import PromptTemplateUnit
+from proteas.combinations import generate_combinations
+from proteas.combination_index import CombinationIndex
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKENDS = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(numpy is None, reason="numpy not installed")),
+]
+
+
+def make_units():
+    return [
+        PromptTemplateUnit(name="a", content="AAAA"),
+        PromptTemplateUnit(name="b", content="B $x"),
+        PromptTemplateUnit(name="c", content="", prefix="# C"),
+        PromptTemplateUnit(name="d", content=""),
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+class TestCombinationIndex:
+    """Mask materialization, filtering and lazy rendering tests."""
+
+    def test_matches_generate_combinations(self, use_numpy):
+        units = make_units()
+        header = PromptTemplateUnit(name="header", content="H", order=1)
+        index = CombinationIndex(units, min_size=2, max_size=3, base_units=[header],
+                                 use_numpy=use_numpy)
+        expected = list(generate_combinations(units, 2, 3, base_units=[header]))
+
+        assert len(index) == len(expected)
+        for (names, p), (exp_names, exp_p) in zip(index, expected):
+            assert names == exp_names
+            assert p.compile(x="1") == exp_p.compile(x="1")
+
+    def test_sizes(self, use_numpy):
+        index = CombinationIndex(make_units(), use_numpy=use_numpy)
+        sizes = list(index.sizes())
+        assert sizes == [len(index.names(m)) for m in index.masks]
+
+    def test_predicted_lengths_match_compile(self, use_numpy):
+        header = PromptTemplateUnit(name="header", content="Header $x", order=1)
+        index = CombinationIndex(make_units(), base_units=[header], separator="\n--\n",
+                                 use_numpy=use_numpy)
+        lengths = list(index.predicted_lengths(x="value"))
+        actual = [len(p.compile(x="value")) for _, p in index]
+        assert lengths == actual
+
+    def test_select_include_exclude(self, use_numpy):
+        index = CombinationIndex(make_units(), use_numpy=use_numpy)
+        selected = index.select(include=["a"], exclude=["d"])
+        names = [index.names(m) for m in selected.masks]
+        assert names == [("a",), ("a", "b"), ("a", "c"), ("a", "b", "c")]
+
+    def test_select_size_and_length(self, use_numpy):
+        index = CombinationIndex(make_units(), use_numpy=use_numpy)
+        selected = index.select(min_size=2, max_size=2, max_length=8, x="1")
+        assert [names for names, _ in selected] == [("a", "d"), ("b", "c"), ("b", "d"), ("c", "d")]
+
+    def test_select_chains_and_keeps_original(self, use_numpy):
+        index = CombinationIndex(make_units(), use_numpy=use_numpy)
+        selected = index.select(include=["a"]).select(exclude=["b"])
+        assert all(index.names(m)[0] == "a" for m in selected.masks)
+        assert len(index) == 15
+
+    def test_getitem_and_mask_of(self, use_numpy):
+        index = CombinationIndex(make_units(), use_numpy=use_numpy)
+        assert index.mask_of(["a", "c"]) == 0b101
+        names, p = index[0]
+        assert names == ("a",)
+        assert p.compile() == "AAAA"
+
+
+class TestCombinationIndexValidation:
+    """Argument validation tests."""
+
+    def test_too_many_units(self):
+        units = [PromptTemplateUnit(name=str(i)) for i in range(65)]
+        with pytest.raises(ValueError):
+            CombinationIndex(units, max_size=1)
+
+    def test_invalid_sizes(self):
+        with pytest.raises(ValueError):
+            CombinationIndex(make_units(), min_size=0)
+
+    def test_unknown_name(self):
+        with pytest.raises(KeyError):
+            CombinationIndex(make_units()).select(include=["missing"])
+
+    @pytest.mark.skipif(numpy is not None, reason="numpy installed")
+    def test_numpy_required(self):
+        with pytest.raises(ImportError):
+            CombinationIndex(make_units(), use_numpy=True)
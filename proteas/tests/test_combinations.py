@@ -0,0 +1,110 @@
+"""Tests for combination generation and sampling."""
+
+from collections import Counter
+from itertools import combinations
+
+import pytest
+from proteas.unit import PromptTemplateUnit
+from proteas.combinations import (
+    count_combinations,
+    generate_combinations,
+    sample_combinations,
+    unrank_combination,
+)
+
+
+def make_units(n):
+    return [PromptTemplateUnit(name=f"u{i}", content=f"U{i}") for i in range(n)]
+
+
+class TestUnrank:
+    """Unranking tests."""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 6])
+    def test_matches_itertools_order(self, size):
+        expected = list(combinations(range(6), size))
+        assert [unrank_combination(6, size, r) for r in range(len(expected))] == expected
+
+
+class TestSampleCombinations:
+    """Random and stratified sampling tests."""
+
+    def test_yields_names_and_proteas(self):
+        header = PromptTemplateUnit(name="header", content="H", order=1)
+        names, p = next(sample_combinations(make_units(4), k=1, min_size=2, max_size=2,
+                                            base_units=[header], seed=0))
+        assert len(names) == 2
+        assert p.compile().startswith("H\n\n")
+
+    def test_full_sample_covers_space(self):
+        units = make_units(5)
+        sampled = {names for names, _ in sample_combinations(units, k=31, seed=3)}
+        expected = {names for names, _ in generate_combinations(units)}
+        assert sampled == expected
+
+    def test_seed_reproducible(self):
+        units = make_units(10)
+        first = [names for names, _ in sample_combinations(units, k=20, seed=42)]
+        second = [names for names, _ in sample_combinations(units, k=20, seed=42)]
+        assert first == second
+
+    def test_large_space_without_duplicates(self):
+        units = make_units(100)
+        sampled = [names for names, _ in sample_combinations(units, k=500, seed=1)]
+        assert len(sampled) == 500
+        assert len(set(sampled)) == 500
+
+    def test_stratified_sizes(self):
+        units = make_units(12)
+        sizes = Counter(len(names) for names, _ in
+                        sample_combinations(units, k=40, min_size=1, max_size=4,
+                                            stratify=True, seed=5))
+        assert sizes == {1: 10, 2: 10, 3: 10, 4: 10}
+
+    def test_stratified_redistributes_small_sizes(self):
+        units = make_units(3)
+        sizes = Counter(len(names) for names, _ in
+                        sample_combinations(units, k=6, stratify=True, seed=5))
+        assert sizes == {1: 3, 2: 2, 3: 1}
+
+    def test_weights(self):
+        units = make_units(10)
+        sampled = list(sample_combinations(units, k=10, max_size=2, seed=2,
+                                           weights={"u0": 0, "u1": 50}))
+        assert len(sampled) == 10
+        assert all("u0" not in names for names, _ in sampled)
+        assert len({names for names, _ in sampled}) == len(sampled)
+        assert sum("u1" in names for names, _ in sampled) > len(sampled) / 2
+
+    def test_weighted_full_sample_covers_space(self):
+        units = make_units(5)
+        expected = {names for names, _ in generate_combinations(units)}
+        for stratify in (False, True):
+            sampled = [names for names, _ in sample_combinations(
+                units, k=31, seed=3, stratify=stratify, weights={"u1": 1000, "u2": 0.001})]
+            assert len(sampled) == 31
+            assert set(sampled) == expected
+
+    def test_zero_weights_shrink_space(self):
+        units = make_units(5)
+        with pytest.raises(ValueError, match="15 available"):
+            list(sample_combinations(units, k=31, weights={"u0": 0}))
+        sampled = {names for names, _ in sample_combinations(units, k=15, seed=1,
+                                                             weights={"u0": 0})}
+        assert sampled == {names for names, _ in generate_combinations(units[1:])}
+
+    def test_equal_weights_match_uniform(self):
+        units = make_units(8)
+        uniform = [names for names, _ in sample_combinations(units, k=20, seed=4)]
+        for weights in ({}, {f"u{i}": 2.0 for i in range(8)}):
+            weighted = [names for names, _ in sample_combinations(units, k=20, seed=4,
+                                                                  weights=weights)]
+            assert weighted == uniform
+
+    def test_k_too_large(self):
+        with pytest.raises(ValueError):
+            list(sample_combinations(make_units(3), k=count_combinations(3) + 1))
+
+    def test_negative_k(self):
+        with pytest.raises(ValueError):
+            list(sample_combinations(make_units(3), k=-1))
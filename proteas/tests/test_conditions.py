@@ -0,0 +1,134 @@
+"""Tests for conditional units and the decision table."""
+
+import pytest
+from proteas.unit import PromptTemplateUnit
+from proteas.proteas import Proteas
+from proteas.engine import SegmentEngine
+from proteas.combination_index import CombinationIndex
+from proteas.conditions import Absent, Equals, In, Present
+
+
+def make_proteas(engine=None):
+    return Proteas(engine=engine).add_many([
+        PromptTemplateUnit(name="base", content="Base"),
+        PromptTemplateUnit(name="history", content="History: $history",
+                           when=[Present("history")]),
+        PromptTemplateUnit(name="no_history", content="No history",
+                           when=[Absent("history")]),
+        PromptTemplateUnit(name="chat", content="Chat mode", when=[Equals("mode", "chat")]),
+        PromptTemplateUnit(name="eu", content="GDPR", when=[In("region", ["de", "fr"])]),
+        PromptTemplateUnit(name="eu_chat", content="EU chat",
+                           when=[Equals("mode", "chat"), In("region", ("de", "fr"))]),
+    ])
+
+
+class TestConditions:
+    """Condition evaluation tests."""
+
+    def test_present_absent(self):
+        assert Present("a").evaluate({"a": None})
+        assert not Present("a").evaluate({})
+        assert Absent("a").evaluate({})
+
+    def test_equals_requires_presence(self):
+        assert Equals("a", None).evaluate({"a": None})
+        assert not Equals("a", None).evaluate({})
+
+    def test_in_normalizes_values(self):
+        assert In("a", ["x", "y"]).values == ("x", "y")
+        assert In("a", ["x"]).evaluate({"a": "x"})
+
+    def test_unit_applies(self):
+        unit = PromptTemplateUnit(name="u", when=[Present("a"), Equals("b", 1)])
+        assert unit.applies(a=0, b=1)
+        assert not unit.applies(b=1)
+
+    def test_copies_keep_conditions(self):
+        unit = PromptTemplateUnit(name="u", content="x", when=[Present("a")])
+        assert unit.with_content("y").when == unit.when
+        assert unit.with_order(3).when == unit.when
+
+
+@pytest.mark.parametrize("engine", [None, SegmentEngine])
+class TestConditionalCompile:
+    """Proteas compile with conditional units."""
+
+    def test_no_values(self, engine):
+        p = make_proteas(engine and engine())
+        assert p.compile() == "Base\n\nNo history"
+
+    def test_presence(self, engine):
+        p = make_proteas(engine and engine())
+        assert p.compile(history="h") == "Base\n\nHistory: h"
+
+    def test_equality_and_membership(self, engine):
+        p = make_proteas(engine and engine())
+        assert p.compile(mode="chat", region="fr") == \
+            "Base\n\nNo history\n\nChat mode\n\nGDPR\n\nEU chat"
+        assert p.compile(mode="batch", region="us") == "Base\n\nNo history"
+
+    def test_disabled_still_wins(self, engine):
+        p = make_proteas(engine and engine())
+        p.disable("chat")
+        assert "Chat mode" not in p.compile(mode="chat")
+
+
+class TestDecisionTable:
+    """Decision table caching tests."""
+
+    def test_cached_per_signature(self):
+        p = make_proteas()
+        p.compile(mode="chat", history="a")
+        p.compile(mode="chat", history="b")
+        table = p.decision_table
+        assert table.misses == 1
+        assert table.hits == 1
+
+    def test_unknown_values_share_signature(self):
+        p = make_proteas()
+        for i in range(50):
+            p.compile(region=f"r{i}")
+        assert len(p.decision_table) == 1
+
+    def test_unhashable_values_not_cached(self):
+        p = make_proteas()
+        assert p.compile(region=["de"]) == "Base\n\nNo history"
+        assert len(p.decision_table) == 0
+
+    def test_rebuilt_on_add(self):
+        p = make_proteas()
+        first = p.decision_table
+        p.add(PromptTemplateUnit(name="late", content="Late", when=[Present("late")]))
+        assert p.decision_table is not first
+        assert p.compile(late=1).endswith("Late")
+
+    def test_rebuilt_when_conditions_change(self):
+        p = make_proteas()
+        p.compile()
+        p.get_unit("base").when = (Present("flag"),)
+        assert p.compile() == "No history"
+
+    def test_no_conditions(self):
+        p = Proteas().add(PromptTemplateUnit(name="a", content="A"))
+        assert p.compile(x=1) == "A"
+        assert p._decision_table is None  # Never built on the compile path
+        assert len(p.decision_table) == 0
+
+    def test_skipped_after_conditional_units_removed(self):
+        p = make_proteas()
+        p.compile()
+        for name in ("history", "no_history", "chat", "eu", "eu_chat"):
+            p.remove(name)
+        assert p.compile(mode="chat") == "Base"
+        assert p._decision_table is None
+
+
+class TestConditionalCombinationIndex:
+    """Predicted lengths honor conditions."""
+
+    def test_predicted_lengths(self):
+        units = make_proteas().units
+        index = CombinationIndex(units, max_size=2, use_numpy=False)
+        values = {"mode": "chat", "region": "us"}
+        assert list(index.predicted_lengths(**values)) == \
+            [len(p.compile(**values)) for _, p in index]
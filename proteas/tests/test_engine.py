@@ -0,0 +1,121 @@
+"""Tests for assembly engines."""
+
+import random
+
+import pytest
+from proteas.unit import PromptTemplateUnit
+from proteas.proteas import Proteas
+from proteas.engine import RenderEngine, SegmentEngine
+from proteas.instrumentation import Instrumentation, RenderStats
+
+
+EDGE_UNITS = [
+    PromptTemplateUnit(name="plain", content="Plain text"),
+    PromptTemplateUnit(name="slot", content="Hello $name and ${name}!"),
+    PromptTemplateUnit(name="escaped", content="Costs $$5 and $$name"),
+    PromptTemplateUnit(name="invalid", content="Trailing $ and $1 and ${bad"),
+    PromptTemplateUnit(name="unknown", content="Keep $missing and ${missing}"),
+    PromptTemplateUnit(name="only_slot", content="$empty"),
+    PromptTemplateUnit(name="two_slots", content="$empty${empty}"),
+    PromptTemplateUnit(name="framed", content="$empty", prefix="<<", suffix=">>"),
+    PromptTemplateUnit(name="prefix_only", prefix="Header"),
+    PromptTemplateUnit(name="nothing"),
+    PromptTemplateUnit(name="json", content='{"a": $name, "b": {}}', suffix="end"),
+    PromptTemplateUnit(name="off", content="Never", enabled=False),
+]
+
+VALUE_SETS = [
+    {},
+    {"name": "World"},
+    {"name": "World", "empty": ""},
+    {"name": 42, "empty": "x", "missing": "found"},
+    {"empty": ""},
+]
+
+
+def compile_both(units, separator="\n\n", **kwargs):
+    reference = Proteas(separator=separator).add_many(units)
+    segment = Proteas(separator=separator, engine=SegmentEngine()).add_many(units)
+    return (reference.compile(with_spans=True, **kwargs),
+            segment.compile(with_spans=True, **kwargs))
+
+
+class TestSegmentEngineEquivalence:
+    """SegmentEngine must match RenderEngine output exactly."""
+
+    @pytest.mark.parametrize("values", VALUE_SETS)
+    def test_edge_units(self, values):
+        expected, actual = compile_both(EDGE_UNITS, **values)
+        assert actual == expected
+
+    @pytest.mark.parametrize("values", VALUE_SETS)
+    def test_each_unit_alone(self, values):
+        for unit in EDGE_UNITS:
+            expected, actual = compile_both([unit], separator="|", **values)
+            assert actual == expected, unit.name
+
+    def test_random_layouts(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            units = rng.sample(EDGE_UNITS, rng.randint(0, len(EDGE_UNITS)))
+            values = rng.choice(VALUE_SETS)
+            expected, actual = compile_both(units, separator=rng.choice(["", "\n", " -- "]), **values)
+            assert actual == expected
+
+
+class TestSegmentEngineCache:
+    """Program cache tests."""
+
+    def test_program_reused(self):
+        engine = SegmentEngine()
+        p = Proteas(engine=engine).add_many(EDGE_UNITS[:3])
+        p.compile(name="a")
+        p.compile(name="b")
+        assert len(engine) == 1
+
+    def test_content_change_recompiles(self):
+        engine = SegmentEngine()
+        unit = PromptTemplateUnit(name="a", content="One $x")
+        p = Proteas(engine=engine).add(unit)
+        assert p.compile(x="1") == "One 1"
+        unit.content = "Two $x"
+        assert p.compile(x="2") == "Two 2"
+        assert len(engine) == 2
+
+    def test_eviction(self):
+        engine = SegmentEngine(maxsize=2)
+        for i in range(5):
+            Proteas(engine=engine).add(PromptTemplateUnit(name="a", content=str(i))).compile()
+        assert len(engine) == 2
+
+    def test_clear(self):
+        engine = SegmentEngine()
+        Proteas(engine=engine).add(PromptTemplateUnit(name="a", content="A")).compile()
+        engine.clear()
+        assert len(engine) == 0
+
+
+class TestEngineInstrumentation:
+    """Engines report to instrumentation."""
+
+    @pytest.mark.parametrize("engine", [RenderEngine, SegmentEngine])
+    def test_per_unit_stats(self, engine):
+        stats = RenderStats()
+        p = Proteas(engine=engine(), instrumentation=Instrumentation(stats=stats))
+        p.add(PromptTemplateUnit(name="a", content="Hi $name"))
+        p.add(PromptTemplateUnit(name="b", content="$empty"))
+        p.compile(name="Bo", empty="")
+
+        assert stats.units["a"].total_chars == len("Hi Bo")
+        assert stats.units["a"].substitutions == 1
+        assert stats.units["b"].renders == 1
+        assert stats.units["b"].total_chars == 0
+
+    def test_cache_hits_recorded(self):
+        stats = RenderStats()
+        p = Proteas(engine=SegmentEngine(), instrumentation=Instrumentation(stats=stats))
+        p.add(PromptTemplateUnit(name="a", content="A"))
+        p.compile()
+        p.compile()
+        p.compile()
+        assert stats.units["a"].cache_hits == 2
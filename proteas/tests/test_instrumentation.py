@@ -0,0 +1,111 @@
+"""Tests for compile/render instrumentation."""
+
+import pytest
+from proteas.unit import PromptTemplateUnit
+from proteas.proteas import Proteas
+from proteas.instrumentation import Instrumentation, RenderStats, count_substitutions
+
+
+class TestCountSubstitutions:
+    """Placeholder counting tests."""
+
+    def test_counts_only_known_placeholders(self):
+        assert count_substitutions("$a and ${b} and $c", {"a": 1, "b": 2}) == 2
+
+    def test_escaped_dollar_not_counted(self):
+        assert count_substitutions("$$a costs $a", {"a": 1}) == 1
+
+    def test_no_values(self):
+        assert count_substitutions("$a", {}) == 0
+
+
+class TestInstrumentationHooks:
+    """Hook invocation tests."""
+
+    def test_output_unchanged(self):
+        p = Proteas(instrumentation=Instrumentation(stats=RenderStats()))
+        p.add(PromptTemplateUnit(name="a", content="Hello $name"))
+        p.add(PromptTemplateUnit(name="b", content="Bye"))
+        assert p.compile(name="World") == "Hello World\n\nBye"
+
+    def test_hooks_called_in_order(self):
+        events = []
+        instr = Instrumentation()
+        instr.pre_compile.append(lambda p, kw: events.append("pre_compile"))
+        instr.pre_render.append(lambda u, kw: events.append(f"pre_{u.name}"))
+        instr.post_render.append(lambda u, out, t: events.append(f"post_{u.name}"))
+        instr.post_compile.append(lambda p, out, t: events.append("post_compile"))
+
+        p = Proteas(instrumentation=instr)
+        p.add(PromptTemplateUnit(name="a", content="A"))
+        p.add(PromptTemplateUnit(name="b", content="B"))
+        p.compile()
+
+        assert events == [
+            "pre_compile", "pre_a", "post_a", "pre_b", "post_b", "post_compile",
+        ]
+
+    def test_disabled_units_not_rendered(self):
+        rendered = []
+        instr = Instrumentation()
+        instr.pre_render.append(lambda u, kw: rendered.append(u.name))
+
+        p = Proteas(instrumentation=instr)
+        p.add(PromptTemplateUnit(name="a", content="A"))
+        p.add(PromptTemplateUnit(name="b", content="B", enabled=False))
+        p.compile()
+        assert rendered == ["a"]
+
+
+class TestRenderStats:
+    """Stats collector tests."""
+
+    def _compile_twice(self):
+        stats = RenderStats()
+        p = Proteas(instrumentation=Instrumentation(stats=stats))
+        p.add(PromptTemplateUnit(name="a", content="Hi $name, $name"))
+        p.add(PromptTemplateUnit(name="b", content="Static"))
+        p.compile(name="Bob")
+        p.compile(name="Al")
+        return stats
+
+    def test_unit_stats(self):
+        stats = self._compile_twice()
+        a = stats.units["a"]
+        assert a.renders == 2
+        assert a.substitutions == 4
+        assert a.total_chars == len("Hi Bob, Bob") + len("Hi Al, Al")
+        assert a.max_chars == len("Hi Bob, Bob")
+        assert stats.units["b"].substitutions == 0
+
+    def test_compile_stats(self):
+        stats = self._compile_twice()
+        assert stats.compiles == 2
+        assert stats.max_compile_chars == len("Hi Bob, Bob\n\nStatic")
+        assert stats.compile_time >= stats.max_compile_time >= 0
+
+    def test_summary(self):
+        summary = self._compile_twice().summary()
+        assert summary["compiles"] == 2
+        assert summary["units"]["a"]["renders"] == 2
+        assert summary["units"]["b"]["cache_hits"] == 0
+
+    def test_prometheus(self):
+        text = self._compile_twice().to_prometheus()
+        assert "# TYPE proteas_compiles_total counter" in text
+        assert "proteas_compiles_total 2" in text
+        assert 'proteas_unit_renders_total{unit="a"} 2' in text
+        assert 'proteas_unit_substitutions_total{unit="a"} 4' in text
+
+    def test_prometheus_escapes_labels(self):
+        stats = RenderStats()
+        p = Proteas(instrumentation=Instrumentation(stats=stats))
+        p.add(PromptTemplateUnit(name='say "hi"', content="x"))
+        p.compile()
+        assert 'unit="say \\"hi\\""' in stats.to_prometheus()
+
+    def test_reset(self):
+        stats = self._compile_twice()
+        stats.reset()
+        assert stats.compiles == 0
+        assert stats.units == {}
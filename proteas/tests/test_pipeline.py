@@ -0,0 +1,171 @@
+"""Tests for the async combination pipeline."""
+
+import asyncio
+
+import pytest
+from proteas.unit import PromptTemplateUnit
+from proteas.proteas import Proteas
+from proteas.combinations import generate_combinations
+from proteas.pipeline import CombinationPipeline
+
+
+def make_units(n=5):
+    return [PromptTemplateUnit(name=f"u{i}", content=f"U{i} $x") for i in range(n)]
+
+
+def collect(pipeline):
+    async def run():
+        return [result async for result in pipeline]
+    return asyncio.run(run())
+
+
+class TestCombinationPipeline:
+    """Rendering, concurrency and backpressure tests."""
+
+    def test_all_results(self):
+        async def echo(names, prompt):
+            await asyncio.sleep(0)
+            return prompt.upper()
+
+        units = make_units()
+        pipeline = CombinationPipeline(generate_combinations(units), echo, x="v")
+        results = collect(pipeline)
+
+        expected = {names: p.compile(x="v") for names, p in generate_combinations(units)}
+        assert {r.names: r.prompt for r in results} == expected
+        assert all(r.ok and r.value == r.prompt.upper() for r in results)
+        assert pipeline.progress.consumed == len(expected)
+        assert pipeline.progress.in_flight == 0
+
+    def test_concurrency_limit(self):
+        active = 0
+        peak = 0
+
+        async def consume(names, prompt):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.001)
+            active -= 1
+
+        collect(CombinationPipeline(generate_combinations(make_units()), consume,
+                                    concurrency=3))
+        assert peak == 3
+
+    def test_backpressure(self):
+        pulled = 0
+        lead = 0
+        done = 0
+
+        def source():
+            nonlocal pulled, lead
+            for item in generate_combinations(make_units(6)):
+                pulled += 1
+                lead = max(lead, pulled - done)
+                yield item
+
+        async def slow(names, prompt):
+            nonlocal done
+            await asyncio.sleep(0.001)
+            done += 1
+
+        collect(CombinationPipeline(source(), slow, concurrency=2, buffer_size=3))
+        assert pulled == 63
+        # At most: in the consumer + buffered + one being rendered
+        assert lead <= 2 + 3 + 1
+
+    def test_completion_order(self):
+        async def consume(names, prompt):
+            await asyncio.sleep(0.02 if names == ("u0",) else 0)
+            return names
+
+        results = collect(CombinationPipeline(generate_combinations(make_units(3), max_size=1),
+                                              consume, concurrency=3))
+        assert results[-1].names == ("u0",)
+
+    def test_consumer_errors_captured(self):
+        async def flaky(names, prompt):
+            if "u1" in names:
+                raise RuntimeError("boom")
+            return True
+
+        pipeline = CombinationPipeline(generate_combinations(make_units(3)), flaky)
+        results = collect(pipeline)
+        failed = [r for r in results if not r.ok]
+        assert len(failed) == 4
+        assert all(isinstance(r.error, RuntimeError) for r in failed)
+        assert pipeline.progress.failed == 4
+        assert pipeline.progress.completed == 7
+
+    def test_render_error_raised(self):
+        def source():
+            yield ("ok",), Proteas().add(PromptTemplateUnit(name="ok", content="OK"))
+            raise ValueError("bad source")
+
+        async def consume(names, prompt):
+            return prompt
+
+        with pytest.raises(ValueError, match="bad source"):
+            collect(CombinationPipeline(source(), consume))
+
+    @pytest.mark.parametrize("error", [asyncio.CancelledError, KeyboardInterrupt])
+    def test_consumer_base_exception_raised(self, error):
+        async def fatal(names, prompt):
+            if "u1" in names:
+                raise error()
+            return True
+
+        async def drain():
+            pipeline = CombinationPipeline(generate_combinations(make_units(4)), fatal,
+                                           concurrency=2, buffer_size=1)
+            return [result async for result in pipeline]
+
+        async def run():
+            return await asyncio.wait_for(drain(), timeout=5)  # Fails instead of hanging
+
+        with pytest.raises(error):
+            asyncio.run(run())
+
+    @pytest.mark.parametrize("error", [asyncio.CancelledError, KeyboardInterrupt])
+    def test_source_base_exception_raised(self, error):
+        def source():
+            yield ("ok",), Proteas().add(PromptTemplateUnit(name="ok", content="OK"))
+            raise error()
+
+        async def consume(names, prompt):
+            return prompt
+
+        async def drain():
+            pipeline = CombinationPipeline(source(), consume, concurrency=2, buffer_size=1)
+            return [result async for result in pipeline]
+
+        async def run():
+            return await asyncio.wait_for(drain(), timeout=5)  # Fails instead of hanging
+
+        with pytest.raises(error):
+            asyncio.run(run())
+
+    def test_early_exit_stops_rendering(self):
+        pulled = 0
+
+        def source():
+            nonlocal pulled
+            for item in generate_combinations(make_units(8)):
+                pulled += 1
+                yield item
+
+        async def consume(names, prompt):
+            return names
+
+        async def run():
+            pipeline = CombinationPipeline(source(), consume, concurrency=2)
+            async for _ in pipeline:
+                break
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        assert pulled < 255
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            CombinationPipeline([], None, concurrency=0)
@@ -235,3 +235,38 @@ class TestProteasStr:
         p.add(PromptTemplateUnit(name="a", content="..."))
         p.add(PromptTemplateUnit(name="b", content="...", enabled=False))
         assert "1/2" in str(p)
+
+
+class TestProteasSpans:
+    """Unit span offset tests."""
+
+    def test_spans_locate_each_unit(self):
+        p = Proteas(separator="\n---\n")
+        p.add(PromptTemplateUnit(name="a", content="Hello $name", prefix="# A"))
+        p.add(PromptTemplateUnit(name="b", content="Second"))
+        prompt, spans = p.compile(with_spans=True, name="World")
+
+        assert prompt == p.compile(name="World")
+        assert [s[0] for s in spans] == ["a", "b"]
+        assert prompt[spans[0][1]:spans[0][2]] == "# A\nHello World"
+        assert prompt[spans[1][1]:spans[1][2]] == "Second"
+
+    def test_spans_follow_sorted_order(self):
+        p = Proteas()
+        p.add(PromptTemplateUnit(name="late", content="Late", order=10))
+        p.add(PromptTemplateUnit(name="early", content="Early", order=1))
+        prompt, spans = p.compile(with_spans=True)
+        assert spans == [("early", 0, 5), ("late", 7, 11)]
+
+    def test_spans_skip_disabled_and_empty_units(self):
+        p = Proteas()
+        p.add(PromptTemplateUnit(name="a", content="A"))
+        p.add(PromptTemplateUnit(name="off", content="Off", enabled=False))
+        p.add(PromptTemplateUnit(name="empty", content=""))
+        p.add(PromptTemplateUnit(name="b", content="B"))
+        prompt, spans = p.compile(with_spans=True)
+        assert prompt == "A\n\nB"
+        assert spans == [("a", 0, 1), ("b", 3, 4)]
+
+    def test_spans_empty_prompt(self):
+        assert Proteas().compile(with_spans=True) == ("", [])
@@ -0,0 +1,152 @@
+"""Tests for the local compile service."""
+
+import subprocess
+import sys
+import time
+
+import pytest
+from proteas.unit import PromptTemplateUnit
+from proteas.proteas import Proteas
+from proteas.engine import SegmentEngine
+from proteas.instrumentation import RenderStats
+from proteas.service import CompileClient, CompileServer, ServiceError
+
+
+def make_loader(greeting):
+    def load():
+        return {
+            "greet": Proteas().add_many([
+                PromptTemplateUnit(name="hello", content=f"{greeting} $name"),
+                PromptTemplateUnit(name="footer", content="Bye"),
+            ]),
+            "static": Proteas().add(PromptTemplateUnit(name="s", content="Static")),
+        }
+    return load
+
+
+class SlowEngine(SegmentEngine):
+    """SegmentEngine that sleeps for the `delay` placeholder value."""
+
+    def assemble(self, units, separator, kwargs, spans=None, instrumentation=None):
+        time.sleep(float(kwargs.get("delay", 0)))
+        return super().assemble(units, separator, kwargs, spans, instrumentation)
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def address(request, tmp_path):
+    if request.param == "unix":
+        return str(tmp_path / "proteas.sock")
+    return ("127.0.0.1", 0)
+
+
+class TestCompileService:
+    """Client/server round trips."""
+
+    def test_compile_matches_local(self, address):
+        local = make_loader("Hello")()["greet"].compile(name="Ann")
+        with CompileServer(make_loader("Hello"), address) as server:
+            with CompileClient(server.address) as client:
+                assert client.compile("greet", name="Ann") == local
+                assert client.last_latency >= 0
+                assert client.last_round_trip >= client.last_latency
+
+    def test_spans(self, address):
+        with CompileServer(make_loader("Hello"), address) as server:
+            with CompileClient(server.address) as client:
+                prompt, spans = client.compile("greet", with_spans=True, name="Ann")
+        assert spans == [("hello", 0, 9), ("footer", 11, 14)]
+        assert prompt[0:9] == "Hello Ann"
+
+    def test_batch(self, address):
+        with CompileServer(make_loader("Hi"), address) as server:
+            with CompileClient(server.address) as client:
+                prompts = client.compile_batch([
+                    ("greet", {"name": "A"}),
+                    ("static", {}),
+                ])
+                assert prompts == ["Hi A\n\nBye", "Static"]
+                assert len(client.last_latencies) == 2
+
+    def test_batch_failure(self, address):
+        with CompileServer(make_loader("Hi"), address) as server:
+            with CompileClient(server.address) as client:
+                with pytest.raises(ServiceError, match="missing"):
+                    client.compile_batch([("greet", {}), ("missing", {})])
+
+    def test_unknown_layout(self, address):
+        with CompileServer(make_loader("Hi"), address) as server:
+            with CompileClient(server.address) as client:
+                with pytest.raises(ServiceError):
+                    client.compile("missing")
+                assert client.ping()  # connection still usable
+
+    def test_timeout_resets_connection(self, address):
+        with CompileServer(make_loader("Hi"), address, engine=SlowEngine()) as server:
+            with CompileClient(server.address, timeout=0.2) as client:
+                with pytest.raises(TimeoutError):
+                    client.compile("greet", name="Slow", delay=0.5)
+                assert client.compile("greet", name="Fast") == "Hi Fast\n\nBye"
+                time.sleep(0.4)  # the late reply must not be read as the next answer
+                assert client.compile("greet", name="Next") == "Hi Next\n\nBye"
+
+    def test_hot_reload(self, address):
+        greetings = iter(["Hello", "Howdy"])
+        server = CompileServer(lambda: make_loader(next(greetings))(), address)
+        with server:
+            with CompileClient(server.address) as client:
+                assert client.compile("greet", name="X").startswith("Hello")
+                assert sorted(client.reload()) == ["greet", "static"]
+                assert client.compile("greet", name="X").startswith("Howdy")
+
+    def test_requested_reload_runs_in_serving_loop(self, address):
+        greetings = iter(["Hello", "Howdy"])
+        server = CompileServer(lambda: make_loader(next(greetings))(), address)
+        with server:
+            with CompileClient(server.address) as client:
+                server.request_reload()
+                time.sleep(0.3)
+                assert client.compile("greet", name="X").startswith("Howdy")
+
+    def test_failed_reload_keeps_layouts(self, address, capsys):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError("bad units file")
+            return make_loader("Hello")()
+
+        with CompileServer(loader, address) as server:
+            with CompileClient(server.address) as client:
+                server.request_reload()
+                time.sleep(0.3)
+                assert len(calls) == 2
+                assert client.compile("greet", name="X") == "Hello X\n\nBye"
+                with pytest.raises(ServiceError, match="bad units file"):
+                    client.reload()
+                assert client.compile("greet", name="Y") == "Hello Y\n\nBye"
+        assert "bad units file" in capsys.readouterr().err
+
+    def test_layouts_share_warm_engine(self, address):
+        server = CompileServer(make_loader("Hi"), address)
+        assert len(server.engine) == 2
+        assert all(p.engine is server.engine for p in server.layouts.values())
+
+    def test_stats(self, address):
+        with CompileServer(make_loader("Hi"), address, stats=RenderStats()) as server:
+            with CompileClient(server.address) as client:
+                client.compile("greet", name="A")
+                client.compile("greet", name="B")
+                stats = client.stats()
+                assert stats["compiles"] == 2
+                assert stats["units"]["hello"]["cache_hits"] == 2
+                assert "proteas_compiles_total 2" in client.metrics()
+
+
+def test_package_import_is_lazy():
+    code = ("import sys, proteas; "
+            "print(sorted(m for m in ('proteas.service', 'asyncio', 'socketserver') "
+            "if m in sys.modules)); "
+            "print(proteas.CompileClient is __import__('proteas.service').service.CompileClient)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split("\n")[:2] == ["[]", "True"]
@@ -8,6 +8,8 @@ Units are independent and know nothing about other units.
 from dataclasses import dataclass, field
 from string import Template
 
+from proteas.conditions import Condition
+
 
 @dataclass
 class PromptTemplateUnit:
@@ -22,6 +24,8 @@ class PromptTemplateUnit:
         prefix: Optional header text added before content
         suffix: Optional footer text added after content
         enabled: Whether this unit should be included when rendering
+        when: Conditions on compile values that must all hold for Proteas
+              to include this unit (e.g. [Present("history")])
 
     Placeholder syntax:
         Use $variable or ${variable} for placeholders in content.
@@ -35,6 +39,10 @@ class PromptTemplateUnit:
     prefix: str | None = None
     suffix: str | None = None
     enabled: bool = True
+    when: tuple[Condition, ...] = ()
+
+    def __post_init__(self):
+        self.when = tuple(self.when)
 
     def render(self, **kwargs) -> str:
         """
@@ -68,6 +76,17 @@ class PromptTemplateUnit:
 
         return "\n".join(parts)
 
+    def applies(self, **kwargs) -> bool:
+        """
+        Check this unit's conditions against compile values.
+
+        Render itself ignores conditions; Proteas checks them when compiling.
+
+        Returns:
+            True if every condition in `when` holds (or there are none).
+        """
+        return all(condition.evaluate(kwargs) for condition in self.when)
+
     def enable(self) -> "PromptTemplateUnit":
         """Enable this unit. Returns self for chaining."""
         self.enabled = True
@@ -87,6 +106,7 @@ class PromptTemplateUnit:
             prefix=self.prefix,
             suffix=self.suffix,
             enabled=self.enabled,
+            when=self.when,
         )
 
     def with_order(self, order: int | None) -> "PromptTemplateUnit":
@@ -98,6 +118,7 @@ class PromptTemplateUnit:
             prefix=self.prefix,
             suffix=self.suffix,
             enabled=self.enabled,
+            when=self.when,
         )
 
     def __str__(self) -> str: